@@ -2,313 +2,187 @@
 
 import argparse
 import collections
-import itertools
+import functools
+import hashlib
+import json
 import multiprocessing
 import pathlib
 import re
+import zlib
 
 import matplotlib.pyplot as plt
-import matplotlib.ticker
-import numpy as np
-
-try:
-    from .gen import archived_scoresheet_pb2 as scoresheet
-except ImportError:
-    scoresheet = None
 
 from . import graphs
+from . import pack
+from .files import write_file
+from .plotting import RENDERERS, plot, render_graphs
+from .scores import (XAXES, Data, canonical_name, legacy_score_files,
+                     merge_aliases, parse_game_packed, parse_game_pb,
+                     parse_games, scoresheet)
 
 
-XAXES = {
-    "time": (lambda data: data.cumulative("time"),
-             "cumulative playing time (h)"),
-    "turns": (lambda data: data.cumulative("turns"),
-              "cumulative turns taken"),
-    "actions": (lambda data: data.cumulative("actions"),
-                "cumulative actions taken"),
-    "runs": (lambda data: data.count(), "run count"),
-    "date": (lambda data: data["date"], "date"),
-}
-
-LOSS_ENDINGS = {
-    "CORE DESTROYED": "",
-    "SYSTEM CORRUPTED": "C",
-    "CRUSHED BY SINGULARITY!": "!",
-}
-
-
-class Data:
-    def __init__(self, items, xaxis):
-        self._items = list(sorted(items, key=lambda x: x["date"]))
-        self._xaxis = xaxis
-
-    def select(self, field, where=lambda x: True):
-        return (x[field] for x in self._items if where(x))
-
-    def __getitem__(self, field):
-        return self._to_array(self.select(field))
+def parse_shard(value):
+    match = re.fullmatch(r"(\d+)/(\d+)", value)
 
-    def array(self, *args, **kwargs):
-        return self._to_array(self.select(*args, **kwargs))
+    if not match or not 1 <= int(match[1]) <= int(match[2]):
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}'")
 
-    def cumulative(self, *args, **kwargs):
-        values = self.select(*args, **kwargs)
-        values = (x if np.isfinite(x) else 0 for x in values)
-        result = itertools.accumulate(values)
-        return self._to_array(result)
+    return int(match[1]), int(match[2])
 
-    def max(self, *args, **kwargs):
-        result = itertools.accumulate(self.select(*args, **kwargs), max)
-        return self._to_array(result)
 
-    def count(self):
-        return self._to_array(range(1, len(self._items) + 1))
+def parse_window(value):
+    if not re.fullmatch(r"\d+", value) or int(value) < 1:
+        raise argparse.ArgumentTypeError(f"invalid window size '{value}'")
 
-    def xaxis(self):
-        return XAXES[self._xaxis][0](self)
+    return int(value)
 
-    def xlabel(self):
-        return XAXES[self._xaxis][1]
 
-    def _to_array(self, generator):
-        return np.array(list(generator))
+def in_shard(player, shard):
+    index, count = shard
+    digest = zlib.crc32(canonical_name(player).encode())
+    return digest % count == index - 1
 
 
-def parse_filename(filename):
-    parts = re.search(r"(.*)-(\d\d)(\d\d)(\d\d)-(\d\d)(\d\d)(\d\d)"
-                      r"(?:-\d)?--?\d+(?:_w\d*)?(\++)?\.txt$", filename)
-    player = parts[1].replace("/", "").replace(".", "")
-    extended = parts[8]
-
-    date = np.datetime64("20{}-{}-{}T{}:{}:{}"
-                         .format(*parts.groups()[1:7]))
-
-    return player, extended, date
-
-
-def parse_game_legacy(path, args):
-    try:
-        player, extended, date = parse_filename(path.name)
-    except ValueError as e:
-        print(f"Warning: {path.name}: {e}")
-        return
-
+def is_selected(player, args):
     if "player" in args and player not in args.player:
-        return
-
-    with open(path) as game_file:
-        game = game_file.read()
+        return False
 
-    return player, parse_fields(game, date, extended)
+    if args.shard and not in_shard(player, args.shard):
+        return False
 
+    return True
 
-def parse_game_pb(path, args):
-    game = scoresheet.ArchivedPostScoresheetRequest()
 
-    with open(path, "rb") as game_file:
-        game.ParseFromString(game_file.read())
-
-    sheet = game.scoresheet
-    stats = sheet.stats
-    player = sheet.header.player_name
-    _, extended, date = parse_filename(sheet.header.filename)
+def plot_all(data, player, output_dir, args):
+    thumbnail_size = args.thumbnail_size if args.html else None
 
-    if "player" in args and player not in args.player:
-        return
+    for graph in graphs.graphs.items():
+        plot(graph, data, player, output_dir, args.format, args.size,
+             args.renderer, thumbnail_size)
 
-    if not sheet.stats.exploration.spaces_moved.average_speed:
-        return
 
-    win, ending = parse_ending(sheet.header.run_result.upper(),
-                               sheet.game.win_type)
-
-    time = sum(int(x) * 60**(-i)
-               for i, x in enumerate(sheet.game.run_time.split(":")))
-
-    fields = {
-        "date": date,
-        "extended": extended,
-        "win": win,
-        "ending": ending,
-        "version": re.match(r"(\w+ \d+).*", sheet.header.version)[1],
-        "easy": sheet.header.difficulty,
-        "score": sheet.performance.total_score,
-        "value": sheet.performance.value_destroyed.points,
-        "time": time,
-        "turns": stats.exploration.turns_passed,
-        "actions": stats.actions.total.overall,
-        "lore": sheet.game.lore_percent,
-        "gallery": sheet.game.gallery_percent,
-        "achievements": sheet.game.achievement_percent,
-        "speed": 100*100 / stats.exploration.spaces_moved.average_speed,
-        "regions": sheet.performance.regions_visited.count,
-        "prototypes": sheet.performance.prototypes_identified.count,
-        "parts": sheet.peak_state.rating,
-        "slots": stats.build.average_slot_usage_percent.overall,
-        "damage": stats.combat.damage_inflicted.overall,
-        "melee": stats.combat.damage_inflicted.melee,
-        "em": stats.combat.damage_inflicted.electromagnetic,
-        "core": stats.combat.core_remaining_percent,
-        "hacking": sheet.best_states.offensive_hacking,
-        "capacity": stats.build.largest_inventory_capacity.average_capacity,
-        "influence": stats.alert.peak_influence.average_influence,
-        "best_group": stats.allies.total_allies.highest_rated_group,
-    }
+def views(args):
+    if len(args.xaxis) > 1:
+        return args.xaxis
 
-    return player, fields
+    return []
 
 
-def parse_games(score_files, args, func=parse_game_legacy):
-    for path in score_files:
-        result = func(path, args)
+def view_dir(args, xaxis):
+    if len(args.xaxis) > 1:
+        return args.output / xaxis
 
-        if not result:
-            continue
+    return args.output
 
-        player, game = result
 
-        if game["time"] > 0 and game["score"] > 750:
-            yield player, game
+def plot_player(x):
+    player, games, args = x
+    print(f"{player}: {len(games)} games")
 
+    store = None
 
-def parse_ending(ending, win_type):
-    if ending == "SELF-DESTRUCTED":
-        return -1, ""
+    if args.rolling:
+        from . import rolling
+        store = rolling.Store(args.output / "rolling" / f"{player}.json",
+                              args.rolling)
 
-    if ending in LOSS_ENDINGS:
-        return 0, LOSS_ENDINGS[ending]
+    data = Data(games, args.xaxis[0], store)
 
-    if win_type < 0:
-        return 0, ""
+    for xaxis in args.xaxis:
+        output_dir = view_dir(args, xaxis) / player
+        output_dir.mkdir(parents=True, exist_ok=True)
 
-    if win_type > 0:
-        return 1, str(win_type)
+        plot_all(data.with_xaxis(xaxis), player, output_dir, args)
 
-    return 1, ""
+        if args.html:
+            from . import html
+            html.write_player_index(player, output_dir, args.format,
+                                    views(args), xaxis)
 
+    if store:
+        store.save()
 
-def parse_fields(game, date, extended):
-    def find(pattern, default=np.nan, type=float):
-        match = re.search(pattern, game, re.DOTALL)
-        if match:
-            return type(match[1])
 
-        return default
+def data_hash(games):
+    games = sorted(games, key=lambda x: x["date"])
+    return hashlib.sha1(repr(games).encode()).hexdigest()
 
-    win, ending = parse_ending(find(r"---\[ (.*) \]---", type=str),
-                               find(r"Win Type: (\d+)", type=int))
 
+def manifest_entry(player, games):
     return {
-        "date": date,
-        "extended": extended,
-        "win": win,
-        "ending": ending,
-        "version": find(r"Cogmind - (\w+ \d+)", type=str),
-        "easy": find(r"Easy Mode: (\d+)", 0),
-        "score": find(r"\s+TOTAL SCORE: (-?\d+)"),
-        "value": find(r"Value Destroyed \((\d+)\)"),
-        "time": find(r"Play Time: (\d+) min") / 60,
-        "turns": find(r"Turns Passed\s+(\d+)"),
-        "actions": find(r"Actions Taken\s+(\d+)"),
-        "lore": find(r"Lore%: (\d+)", 0),
-        "gallery": find(r"Gallery%: (\d+)", 0),
-        "achievements": find(r"Achievement%: (\d+)", 0),
-        "speed": find(r"Average Speed \(%\)\s+(\d+)"),
-        "regions": find(r"Regions Visited\s+(\d+)"),
-        "prototypes": find(r"Prototype IDs \((\d+)\)"),
-        "parts": find(r"Peak State.*?\[Rating: (\d+)\]", 0),
-        "slots": find(r"Average Slot Usage \(%\)\s+(\d+)"),
-        "damage": find(r"Damage Inflicted\s+(\d+)"),
-        "melee": find(r"Damage Inflicted.*?Melee\s+(\d+)"),
-        "em": find(r"Damage Inflicted.*?Electromagnetic\s+(\d+)"),
-        "core": find(r"Average Core Remaining \(%\)\s+(\d+)"),
-        "hacking": find(r"Offensive Hacking\s+(\d+)", 0),
-        "capacity": find(r"Average Capacity\s+(\d+)"),
-        "influence": find(r"Average Influence\s+(\d+)"),
-        "best_group": find(r"Highest-Rated Group\s+(\d+)"),
+        "player": player,
+        "games": len(games),
+        "last_run": str(max(x["date"] for x in games)),
+        "hash": data_hash(games),
     }
 
 
-def plot(graph, data, player, output_dir, args):
-    def smart_format(value, pos, base=matplotlib.ticker.EngFormatter(sep="")):
-        if 0 < value < 1:
-            return f"{value:g}"
-
-        return base(value)
-
-    filename, func = graph
+def shard_manifest_path(output_dir, shard):
+    index, count = shard
+    return output_dir / "shards" / f"{index}-of-{count}.json"
 
-    fig, ax = plt.subplots()
-    fig.suptitle(f"{player}'s Cogmind progression", fontsize=8)
-    ax.set_xlabel(data.xlabel())
 
-    formatter = matplotlib.ticker.FuncFormatter(smart_format)
-    ax.yaxis.set_major_formatter(formatter)
+def shard_generation_path(output_dir, count):
+    return output_dir / "shards" / f"merged-of-{count}"
 
-    if np.issubdtype(data.xaxis().dtype, np.datetime64):
-        fig.autofmt_xdate()
-        margin = 0.2 * (max(data.xaxis()) - min(data.xaxis()))
-        ax.set_xlim(min(data.xaxis()) - margin,
-                    max(data.xaxis()) + margin)
-    else:
-        ax.xaxis.set_major_formatter(formatter)
-
-    func(ax, data)
 
-    if np.issubdtype(data.xaxis().dtype, np.datetime64):
-        ax.set_xlim(ax.get_xticks()[0], ax.get_xticks()[-1])
-    else:
-        ax.set_xlim(0, ax.get_xticks()[-1])
+def shard_generation(output_dir, count):
+    try:
+        return int(shard_generation_path(output_dir, count).read_text())
+    except FileNotFoundError:
+        return 0
 
-    ax.set_ylim(ymax=ax.get_yticks()[-1])
 
-    basename = output_dir / filename
-    plt.savefig(basename.with_suffix(".svg"))
-    plt.close(fig)
+def write_shard_manifest(scores, args):
+    path = shard_manifest_path(args.output, args.shard)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    generation = shard_generation(args.output, args.shard[1]) + 1
 
-    if args.format == "png":
-        dpi = args.size / fig.get_size_inches()[0]
+    write_file(path, json.dumps({
+        "generation": generation,
+        "players": [manifest_entry(*x) for x in scores.items()],
+    }))
 
-        import cairosvg
-        cairosvg.svg2png(url=str(basename.with_suffix(".svg")), dpi=dpi,
-                         write_to=str(basename.with_suffix(".png")))
 
+def merge_shard_manifests(output_dir, count):
+    generation = shard_generation(output_dir, count) + 1
+    entries = []
 
-def plot_all(data, player, output_dir, args):
-    for graph in graphs.graphs.items():
-        plot(graph, data, player, output_dir, args)
+    for i in range(1, count + 1):
+        path = shard_manifest_path(output_dir, (i, count))
 
+        try:
+            with open(path) as manifest_file:
+                manifest = json.load(manifest_file)
+        except FileNotFoundError:
+            return
 
-def plot_player(x):
-    player, games, args = x
-    print(f"{player}: {len(games)} games")
+        if manifest["generation"] != generation:
+            return
 
-    output_dir = args.output / player
-    output_dir.mkdir(parents=True, exist_ok=True)
+        entries.extend(manifest["players"])
 
-    data = Data(games, args.xaxis)
-    plot_all(data, player, output_dir, args)
+    write_file(shard_generation_path(output_dir, count), str(generation))
 
-    if args.html:
-        from . import html
-        html.write_player_index(player, output_dir, args.format)
+    return entries
 
 
-def merge_aliases(scores):
-    Alias = collections.namedtuple("Alias", "name games")
+def write_indexes(entries, args):
+    from . import html
 
-    def best_name(aliases):
-        return max(aliases, key=lambda x: len(x.games)).name
+    for xaxis in args.xaxis:
+        output_dir = view_dir(args, xaxis)
+        view_entries = entries
 
-    def merge_games(aliases):
-        return sum((x.games for x in aliases), [])
+        if "player" in args:
+            view_entries = html.update_manifest(entries, output_dir)
 
-    players = collections.defaultdict(list)
-    for player, games in scores.items():
-        canonical_name = player.lower().replace(".", "")
-        players[canonical_name].append(Alias(player, games))
+        html.write_index(view_entries, output_dir, args.thumbnail_size,
+                         views(args), xaxis)
 
-    return {best_name(x): merge_games(x) for x in players.values()}
+    if views(args):
+        write_file(args.output / "index.html",
+                   html.build_redirect(f"{args.xaxis[0]}/"))
 
 
 def generate_tasks(scores, args):
@@ -330,30 +204,71 @@ def main():
                         help="Path to output folder")
     parser.add_argument("--pb-path", type=pathlib.Path,
                         help="Path to additional protobuf scores")
-    parser.add_argument("--xaxis", choices=XAXES.keys(), default="time",
-                        help="X axis variable")
+    parser.add_argument("--xaxis", choices=[*XAXES.keys(), "all"],
+                        action="append", default=argparse.SUPPRESS,
+                        help="X axis variable (default: time), repeat to "
+                             "render each into its own subfolder")
     parser.add_argument("--player", action="append", default=argparse.SUPPRESS,
                         help="Only plot the specified player")
     parser.add_argument("--format", choices=["svg", "png"], default="svg",
                         help="Output image format")
     parser.add_argument("--size", type=int, default="1280",
                         help="Output image width")
+    parser.add_argument("--thumbnail-size", type=int, default=320,
+                        help="Thumbnail width on HTML player pages")
+    parser.add_argument("--renderer", choices=RENDERERS.keys(),
+                        default="matplotlib",
+                        help="Graph renderer, the native SVG writer falls "
+                             "back to matplotlib for unsupported graphs")
+    parser.add_argument("--rolling", type=parse_window, metavar="WINDOW",
+                        help="Overlay rolling statistics over the last WINDOW "
+                             "runs on scatter graphs")
     parser.add_argument("--html", action="store_true",
                         help="Make HTML index files")
+    parser.add_argument("--shard", type=parse_shard,
+                        help="Only plot the players of shard I/N")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="Serve graphs over HTTP, rendering on demand")
+    parser.add_argument("--memory-cache", type=int, default=64,
+                        help="In-memory render cache size (MiB) for --serve")
+    parser.add_argument("--disk-cache", type=int, default=1024,
+                        help="On-disk render cache size (MiB) for --serve")
+    parser.add_argument("--pack", action="store_true",
+                        help="Append new scoresheets from path into a pack "
+                             "file in output and exit")
     args = parser.parse_args()
 
+    if "xaxis" not in args:
+        args.xaxis = ["time"]
+    elif "all" in args.xaxis:
+        args.xaxis = list(XAXES.keys())
+    else:
+        args.xaxis = list(dict.fromkeys(args.xaxis))
+
     plt.switch_backend("svg")
 
     if not args.path.is_dir():
         print(f"Error: '{args.path}' is not a directory!")
         return
 
-    score_files = args.path.glob("*-*-*-*.txt")
-    score_files = (x for x in score_files if "_log" not in x.name)
+    if args.pack:
+        count = pack.append(args.output / "scores.pack",
+                            legacy_score_files(args.path))
+        print(f"Packed {count} new scoresheets")
+        return
+
+    pack_paths = sorted(args.path.glob("*.pack"))
+    score_files = legacy_score_files(args.path, pack.names(pack_paths))
 
+    select = functools.partial(is_selected, args=args)
     scores = collections.defaultdict(list)
 
-    for player, game in parse_games(score_files, args):
+    for pack_path in pack_paths:
+        for player, game in parse_games(pack.read(pack_path), select,
+                                        func=parse_game_packed):
+            scores[player].append(game)
+
+    for player, game in parse_games(score_files, select):
         scores[player].append(game)
 
     if args.pb_path:
@@ -365,28 +280,41 @@ def main():
             print(f"Error: '{args.pb_path}' is not a directory!")
             return
 
-        for player, game in parse_games(args.pb_path.glob("*"), args,
+        for player, game in parse_games(args.pb_path.glob("*"), select,
                                         func=parse_game_pb):
             scores[player].append(game)
 
     scores = merge_aliases(scores)
     scores = {k: v for k, v in scores.items() if len(v) >= 2}
 
-    if not scores:
+    if not scores and not args.shard:
         print("Could not find any players with at least 2 games.")
         return
 
+    if args.serve is not None:
+        from . import server
+        datasets = {k: (Data(v, args.xaxis[0]), manifest_entry(k, v))
+                    for k, v in scores.items()}
+        server.serve(datasets, render_graphs, args)
+        return
+
     if len(scores) > 1:
         print(f"Plotting {len(scores)} players")
 
-    if args.html:
-        from . import html
-        html.write_index(scores, args.output, args.size)
+    if args.html and not args.shard:
+        write_indexes([manifest_entry(*x) for x in scores.items()], args)
 
     with multiprocessing.Pool() as pool:
         for _ in pool.imap(plot_player, generate_tasks(scores, args)):
             pass
 
+    if args.html and args.shard:
+        write_shard_manifest(scores, args)
+        entries = merge_shard_manifests(args.output, args.shard[1])
+
+        if entries is not None:
+            write_indexes(entries, args)
+
 
 if __name__ == "__main__":
     main()
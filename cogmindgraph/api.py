@@ -0,0 +1,172 @@
+"""In-process interface for ingesting scoresheets and rendering graphs.
+
+A Dataset keeps the parsed games of every player in memory, so new batches of
+scoresheets can be added without rescanning the old ones. A Renderer keeps a
+pool of worker processes alive between render calls::
+
+    from cogmindgraph import api
+
+    dataset = api.Dataset()
+    dataset.ingest(pathlib.Path("scores").glob("*.txt"))
+
+    with api.Renderer() as renderer:
+        images = renderer.render(dataset, players=["Ape"], names=["score"])
+        svg = images["Ape"]["score"]
+"""
+
+import collections
+import multiprocessing
+import pathlib
+
+import matplotlib.pyplot as plt
+
+from . import graphs
+from .plotting import render_graphs
+from .scores import (Data, canonical_name, merge_aliases, parse_game_packed,
+                     parse_game_pb_bytes, parse_games)
+from .scores import scoresheet as scoresheet_pb2
+
+
+def read_scoresheet(scoresheet):
+    if isinstance(scoresheet, tuple):
+        return scoresheet
+
+    path = pathlib.Path(scoresheet)
+    return path.name, path.read_bytes()
+
+
+def parse_packed_pb(item, select=None):
+    return parse_game_pb_bytes(item[1], select)
+
+
+class Dataset:
+    """Parsed games of all players, kept in memory between batches."""
+
+    def __init__(self, min_games=2):
+        self.min_games = min_games
+        self._scores = collections.defaultdict(list)
+        self._names = set()
+        self._players = None
+        self._data = {}
+
+    def ingest(self, scoresheets, protobuf=False):
+        """Add a batch of scoresheets and return the number of new games.
+
+        Each scoresheet is either a path or a (filename, content) pair with
+        the content as bytes. The filenames of text scoresheets must follow
+        the naming used in the Cogmind scores folder; run logs and
+        unrecognized filenames are skipped. Scoresheets whose filename has
+        already been ingested are skipped. Nothing is added if the batch
+        fails to parse.
+        """
+        if protobuf and not scoresheet_pb2:
+            raise RuntimeError("Run ./build_proto.sh in order to ingest "
+                               "protobuf scoresheets")
+
+        names = set()
+
+        def unseen(scoresheets):
+            for name, content in map(read_scoresheet, scoresheets):
+                if name in self._names or name in names:
+                    continue
+
+                if not protobuf and "_log" in name:
+                    continue
+
+                names.add(name)
+                yield name, content
+
+        func = parse_packed_pb if protobuf else parse_game_packed
+        games = list(parse_games(unseen(scoresheets), func=func))
+        self._names.update(names)
+
+        for player, game in games:
+            self._scores[player].append(game)
+            self._data.pop(canonical_name(player), None)
+            self._players = None
+
+        return len(games)
+
+    def players(self):
+        """Return the game counts of players with at least min_games."""
+        return {k: len(v) for k, v in self._merged().items()}
+
+    def games(self, player):
+        return self._merged()[player]
+
+    def data(self, player, xaxis="time"):
+        """Return the Data of a player, shared between x axes and calls."""
+        key = canonical_name(player)
+
+        if key not in self._data:
+            self._data[key] = Data(self.games(player), xaxis)
+
+        return self._data[key].with_xaxis(xaxis)
+
+    def _merged(self):
+        if self._players is None:
+            scores = merge_aliases(self._scores)
+            self._players = {k: v for k, v in scores.items()
+                             if len(v) >= self.min_games}
+
+        return self._players
+
+
+class Renderer:
+    """Renders graphs in a pool of worker processes reused between calls."""
+
+    def __init__(self, processes=None, image_format="svg", size=1280,
+                 renderer="matplotlib"):
+        self.image_format = image_format
+        self.size = size
+        self.renderer = renderer
+        self._pool = multiprocessing.Pool(processes,
+                                          initializer=plt.switch_backend,
+                                          initargs=("svg",))
+
+    def render(self, dataset, players=None, names=None, xaxis="time"):
+        """Render graphs into memory.
+
+        Returns a dict mapping each player to a dict of graph name to image
+        content. By default all players of the dataset and all graphs are
+        rendered.
+        """
+        if players is None:
+            players = list(dataset.players())
+
+        if names is None:
+            names = list(graphs.graphs)
+
+        tasks = ((x, dataset.data(x, xaxis), names, self.image_format,
+                  self.size, self.renderer) for x in players)
+        return dict(zip(players, self._pool.imap(render_graphs, tasks)))
+
+    def write(self, dataset, output_dir, players=None, names=None,
+              xaxis="time"):
+        """Render graphs into output_dir/<player>/<graph>.<format>.
+
+        Returns the paths of the written files.
+        """
+        paths = []
+        images = self.render(dataset, players, names, xaxis)
+
+        for player, contents in images.items():
+            player_dir = pathlib.Path(output_dir) / player
+            player_dir.mkdir(parents=True, exist_ok=True)
+
+            for name, content in contents.items():
+                path = player_dir / f"{name}.{self.image_format}"
+                path.write_bytes(content)
+                paths.append(path)
+
+        return paths
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,20 @@
+import pathlib
+import tempfile
+
+
+def write_file(path, content):
+    binary = isinstance(content, bytes)
+
+    if path.is_file():
+        current = path.read_bytes() if binary else path.read_text()
+
+        if current == content:
+            return
+
+    with tempfile.NamedTemporaryFile("wb" if binary else "w",
+                                     dir=path.parent,
+                                     prefix=f".{path.name}.", suffix=".tmp",
+                                     delete=False) as output:
+        output.write(content)
+
+    pathlib.Path(output.name).replace(path)
@@ -74,6 +74,7 @@ def scatter_plot(ax, data, y, ymin=0, mark_versions=True):
 
     ax.set_ylim(ymin=ymin)
     trendline(ax, data, y)
+    rolling_overlay(ax, data, y)
 
     if mark_versions:
         version_markers(ax, data)
@@ -102,6 +103,21 @@ def trendline(ax, data, y):
     ax.plot(trend_locs, trend(trend_locs), "--", color="0.5", zorder=0)
 
 
+def rolling_overlay(ax, data, y):
+    stats = data.rolling(y)
+
+    if stats is None:
+        return
+
+    x = data.xaxis()
+    ax.autoscale(False)
+    ax.fill_between(x, stats["low"], stats["high"], color="C2", alpha=0.15,
+                    linewidth=0, label="rolling quartiles", zorder=0)
+    ax.plot(x, stats["mean"], color="C2", linewidth=1, label="rolling mean")
+    ax.plot(x, stats["median"], color="C2", linestyle=":", linewidth=1,
+            label="rolling median")
+
+
 def version_markers(ax, data):
     def label(version, position, xycoords="data"):
         ax.annotate(version.lower(), position, xycoords=xycoords,
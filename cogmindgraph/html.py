@@ -1,8 +1,10 @@
 import datetime
+import json
 
 import yattag
 
 from . import graphs
+from .files import write_file
 
 
 def timestamp():
@@ -23,29 +25,88 @@ def build_css(rulesets):
     return "\n".join(build_ruleset(*x) for x in rulesets.items())
 
 
-def write_index(scores, output_dir, size):
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    with open(output_dir / "style.css", "w") as style:
-        style.write(build_css({
-            "body": {
-                "background": "#eee",
-            },
-            ".list": {
-                "display": "flex",
-                "flex-direction": "column",
-                "align-items": "center",
-            },
-            ".list img": {
-                "margin": "0.5em",
-                "max-width": "95vw",
-                "max-height": "95vh",
-            },
-            ".format-svg img": {
-                "width": f"{size}px",
-            },
-        }))
-
+INDEX_SCRIPT = """const PAGE_SIZE = 100;
+const list = document.getElementById("players");
+const search = document.getElementById("search");
+const status = document.getElementById("status");
+const previous = document.getElementById("previous");
+const next = document.getElementById("next");
+let players = [];
+let page = 0;
+
+function matches() {
+  const query = search.value.toLowerCase();
+  return players.filter(x => x.player.toLowerCase().includes(query));
+}
+
+function render() {
+  const found = matches();
+  const pages = Math.max(1, Math.ceil(found.length / PAGE_SIZE));
+  page = Math.min(page, pages - 1);
+  list.replaceChildren(...found
+    .slice(page * PAGE_SIZE, (page + 1) * PAGE_SIZE)
+    .map(x => {
+      const item = document.createElement("li");
+      const link = document.createElement("a");
+      link.href = encodeURIComponent(x.player) + "/";
+      link.textContent = x.player;
+      item.append(link, ` (${x.games} games, last run ${x.last_run.slice(0, 10)})`);
+      return item;
+    }));
+  status.textContent = `Page ${page + 1} of ${pages} (${found.length} players)`;
+  previous.disabled = page === 0;
+  next.disabled = page >= pages - 1;
+}
+
+search.addEventListener("input", () => { page = 0; render(); });
+previous.addEventListener("click", () => { page--; render(); });
+next.addEventListener("click", () => { page++; render(); });
+
+document.getElementById("updated").textContent = MANIFEST.updated;
+players = MANIFEST.players.sort((a, b) =>
+  a.player.toLowerCase().localeCompare(b.player.toLowerCase()));
+render();
+"""
+
+
+def build_style(thumbnail_size):
+    return build_css({
+        "body": {
+            "background": "#eee",
+        },
+        ".list": {
+            "display": "flex",
+            "flex-wrap": "wrap",
+            "justify-content": "center",
+        },
+        ".list img": {
+            "margin": "0.5em",
+            "width": f"{thumbnail_size}px",
+            "max-width": "95vw",
+        },
+    })
+
+
+def add_view_links(doc, view, links):
+    if not links:
+        return
+
+    with doc.tag("p"):
+        doc.text("X axis: ")
+
+        for i, (name, href) in enumerate(links.items()):
+            if i > 0:
+                doc.text(" | ")
+
+            if name == view:
+                with doc.tag("strong"):
+                    doc.text(name)
+            else:
+                with doc.tag("a", href=href):
+                    doc.text(name)
+
+
+def build_index(views=(), view=None):
     doc, tag, text = yattag.Doc().tagtext()
     doc.asis("<!DOCTYPE html>")
 
@@ -60,21 +121,94 @@ def write_index(scores, output_dir, size):
                 text("Cogmind progression graphs")
 
             with tag("p"):
-                text(f"Last updated: {timestamp()}")
+                text("Last updated: ")
+                with tag("span", id="updated"):
+                    pass
+
+            add_view_links(doc, view, {x: f"../{x}/" for x in views})
+
+            doc.stag("input", type="search", id="search",
+                     placeholder="Search players")
+
+            with tag("ul", id="players"):
+                pass
+
+            with tag("p"):
+                with tag("button", id="previous"):
+                    text("Previous")
+                with tag("span", id="status"):
+                    pass
+                with tag("button", id="next"):
+                    text("Next")
+
+            with tag("script", src="manifest.js"):
+                pass
+            with tag("script", src="index.js"):
+                pass
+
+    return yattag.indent(doc.getvalue())
+
+
+def build_redirect(href):
+    doc, tag, text = yattag.Doc().tagtext()
+    doc.asis("<!DOCTYPE html>")
+
+    with tag("html", lang="en"):
+        with tag("head"):
+            with tag("title"):
+                text("Cogmind progression graphs")
+            doc.stag("meta", ("http-equiv", "refresh"),
+                     content=f"0; url={href}")
+        with tag("body"):
+            with tag("a", href=href):
+                text("Cogmind progression graphs")
+
+    return yattag.indent(doc.getvalue())
+
+
+def build_manifest(entries):
+    entries = sorted(entries, key=lambda x: x["player"].lower())
+    return json.dumps({"updated": timestamp(), "players": entries},
+                      indent=1)
+
+
+def build_manifest_script(manifest):
+    return f"const MANIFEST = {manifest};\n"
+
+
+def read_manifest(output_dir):
+    try:
+        with open(output_dir / "manifest.json") as manifest:
+            return json.load(manifest)["players"]
+    except FileNotFoundError:
+        return []
+
 
-            with tag("ul"):
-                for player, games in sorted(scores.items(),
-                                            key=lambda x: x[0].lower()):
-                    with tag("li"):
-                        with tag("a", href=player):
-                            text(player)
-                        text(f" ({len(games)} games)")
+def update_manifest(entries, output_dir):
+    players = {x["player"]: x for x in read_manifest(output_dir)}
+    players.update((x["player"], x) for x in entries)
+    return list(players.values())
 
-    with open(output_dir / "index.html", "w") as index:
-        index.write(yattag.indent(doc.getvalue()))
 
+def write_index(entries, output_dir, thumbnail_size, views=(), view=None):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    write_file(output_dir / "style.css", build_style(thumbnail_size))
+    write_file(output_dir / "index.html", build_index(views, view))
+    write_file(output_dir / "index.js", INDEX_SCRIPT)
+
+    manifest = build_manifest(entries)
+    write_file(output_dir / "manifest.json", manifest)
+    write_file(output_dir / "manifest.js", build_manifest_script(manifest))
+
+
+def thumbnail_path(graph, image_format):
+    if image_format == "png":
+        return f"thumbs/{graph}.png"
+
+    return f"{graph}.{image_format}"
 
-def write_player_index(player, output_dir, image_format):
+
+def build_player_index(player, image_format, views=(), view=None):
     doc, tag, text = yattag.Doc().tagtext()
     doc.asis("<!DOCTYPE html>")
 
@@ -85,12 +219,23 @@ def write_player_index(player, output_dir, image_format):
             doc.stag("link", rel="stylesheet", type="text/css",
                      href="../style.css")
         with tag("body"):
+            add_view_links(doc, view, {x: f"../../{x}/{player}/"
+                                       for x in views})
+
             with tag("div", klass=f"list format-{image_format}"):
                 for graph in graphs.graphs.keys():
-                    doc.stag("img", src=f"{graph}.{image_format}", alt=graph)
+                    with tag("a", href=f"{graph}.{image_format}"):
+                        doc.stag("img", alt=graph, loading="lazy",
+                                 src=thumbnail_path(graph, image_format))
 
             with tag("p"):
                 text(f"Last updated: {timestamp()}")
 
-    with open(output_dir / "index.html", "w") as index:
-        index.write(yattag.indent(doc.getvalue()))
+    return yattag.indent(doc.getvalue())
+
+
+def write_player_index(player, output_dir, image_format, views=(),
+                       view=None):
+    write_file(output_dir / "index.html",
+               build_player_index(player, image_format, views, view))
+
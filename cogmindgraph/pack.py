@@ -0,0 +1,103 @@
+import itertools
+import zlib
+
+
+BLOCK_SIZE = 4 * 2**20
+READ_BUFFER_SIZE = 16 * 2**20
+
+
+def index_path(pack_path):
+    return pack_path.with_suffix(".idx")
+
+
+def read_index(pack_path):
+    entries = []
+
+    try:
+        with open(index_path(pack_path)) as index:
+            for line in index:
+                if not line.endswith("\n"):
+                    break
+
+                name, *offsets = line.rstrip("\n").split("\t")
+                entries.append((name, *map(int, offsets)))
+    except FileNotFoundError:
+        pass
+
+    return entries
+
+
+def repair_index(pack_path):
+    try:
+        with open(index_path(pack_path), "rb+") as index:
+            content = index.read()
+
+            if not content.endswith(b"\n"):
+                index.truncate(content.rfind(b"\n") + 1)
+    except FileNotFoundError:
+        pass
+
+
+def names(pack_paths):
+    return {x[0] for pack_path in pack_paths for x in read_index(pack_path)}
+
+
+def append(pack_path, paths):
+    def flush(block, members):
+        if not members:
+            return
+
+        offset = pack.tell()
+        data = zlib.compress(bytes(block), 9)
+        pack.write(data)
+        pack.flush()
+
+        lines = (f"{name}\t{offset}\t{len(data)}\t{start}\t{size}\n"
+                 for name, start, size in members)
+        index.write("".join(lines))
+        index.flush()
+
+    pack_path.parent.mkdir(parents=True, exist_ok=True)
+    repair_index(pack_path)
+
+    known = names([pack_path])
+    count = 0
+
+    with open(pack_path, "ab") as pack, \
+            open(index_path(pack_path), "a") as index:
+        block = bytearray()
+        members = []
+
+        for path in paths:
+            if path.name in known:
+                continue
+
+            content = path.read_bytes()
+            members.append((path.name, len(block), len(content)))
+            block += content
+            known.add(path.name)
+            count += 1
+
+            if len(block) >= BLOCK_SIZE:
+                flush(block, members)
+                block = bytearray()
+                members = []
+
+        flush(block, members)
+
+    return count
+
+
+def read(pack_path):
+    entries = sorted(read_index(pack_path), key=lambda x: (x[1], x[3]))
+
+    with open(pack_path, "rb", buffering=READ_BUFFER_SIZE) as pack:
+        for (offset, size), members in itertools.groupby(
+                entries, key=lambda x: x[1:3]):
+            if pack.tell() != offset:
+                pack.seek(offset)
+
+            block = zlib.decompress(pack.read(size))
+
+            for name, _, _, start, length in members:
+                yield name, block[start:start + length]
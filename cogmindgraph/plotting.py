@@ -0,0 +1,101 @@
+import pathlib
+import tempfile
+
+import matplotlib
+import matplotlib.pyplot as plt
+import matplotlib.ticker
+import numpy as np
+
+from . import graphs
+
+
+def smart_format(value, pos, base=matplotlib.ticker.EngFormatter(sep="")):
+    if 0 < value < 1:
+        return f"{value:g}"
+
+    return base(value)
+
+
+def plot_matplotlib(func, data, player, path, formatter):
+    fig, ax = plt.subplots()
+    fig.suptitle(f"{player}'s Cogmind progression", fontsize=8)
+    ax.set_xlabel(data.xlabel())
+
+    ax.yaxis.set_major_formatter(formatter)
+
+    if np.issubdtype(data.xaxis().dtype, np.datetime64):
+        fig.autofmt_xdate()
+        margin = 0.2 * (max(data.xaxis()) - min(data.xaxis()))
+        ax.set_xlim(min(data.xaxis()) - margin,
+                    max(data.xaxis()) + margin)
+    else:
+        ax.xaxis.set_major_formatter(formatter)
+
+    func(ax, data)
+
+    if np.issubdtype(data.xaxis().dtype, np.datetime64):
+        ax.set_xlim(ax.get_xticks()[0], ax.get_xticks()[-1])
+    else:
+        ax.set_xlim(0, ax.get_xticks()[-1])
+
+    ax.set_ylim(ymax=ax.get_yticks()[-1])
+
+    plt.savefig(path)
+    plt.close(fig)
+
+
+def plot_native(func, data, player, path, formatter):
+    from . import svg
+
+    try:
+        svg.plot(func, data, player, path, formatter)
+    except NotImplementedError:
+        plot_matplotlib(func, data, player, path, formatter)
+
+
+RENDERERS = {
+    "matplotlib": plot_matplotlib,
+    "native": plot_native,
+}
+
+
+def plot(graph, data, player, output_dir, image_format="svg", size=1280,
+         renderer="matplotlib", thumbnail_size=None):
+    filename, func = graph
+    formatter = matplotlib.ticker.FuncFormatter(smart_format)
+    basename = output_dir / filename
+
+    RENDERERS[renderer](func, data.with_graph(filename), player,
+                        basename.with_suffix(".svg"), formatter)
+
+    width = matplotlib.rcParams["figure.figsize"][0]
+
+    if image_format == "png":
+        dpi = size / width
+
+        import cairosvg
+        cairosvg.svg2png(url=str(basename.with_suffix(".svg")), dpi=dpi,
+                         write_to=str(basename.with_suffix(".png")))
+
+        if thumbnail_size:
+            thumbnail = output_dir / "thumbs" / f"{filename}.png"
+            thumbnail.parent.mkdir(exist_ok=True)
+            dpi = thumbnail_size / width
+            cairosvg.svg2png(url=str(basename.with_suffix(".svg")), dpi=dpi,
+                             write_to=str(thumbnail))
+
+
+def render_graphs(x):
+    player, data, names, image_format, size, renderer = x
+    result = {}
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_dir = pathlib.Path(output_dir)
+
+        for name in names:
+            plot((name, graphs.graphs[name]), data, player, output_dir,
+                 image_format, size, renderer)
+            path = output_dir / f"{name}.{image_format}"
+            result[name] = path.read_bytes()
+
+    return result
@@ -0,0 +1,124 @@
+import bisect
+import collections
+import hashlib
+import json
+import math
+
+import numpy as np
+
+from .files import write_file
+
+
+PERCENTILES = (25, 75)
+
+
+def digest(values):
+    values = np.asarray(values, dtype=float)
+    return hashlib.sha1(values.tobytes()).hexdigest()
+
+
+def percentile(ordered, q):
+    position = q / 100 * (len(ordered) - 1)
+    low = math.floor(position)
+    high = math.ceil(position)
+    fraction = position - low
+    return ordered[low] + fraction * (ordered[high] - ordered[low])
+
+
+def check_size(size):
+    if size < 1:
+        raise ValueError(f"invalid window size {size}")
+
+
+class Window:
+    def __init__(self, size, values=(), count=0, stats=None):
+        check_size(size)
+        self.size = size
+        self.count = count
+        self.stats = stats or {"mean": [], "median": [], "low": [],
+                               "high": []}
+        self._values = collections.deque(values)
+        self._sorted = sorted(self._values)
+        self._sum = math.fsum(self._values)
+
+    def append(self, value):
+        if np.isfinite(value):
+            if len(self._values) == self.size:
+                old = self._values.popleft()
+                del self._sorted[bisect.bisect_left(self._sorted, old)]
+                self._sum -= old
+
+            value = float(value)
+            self._values.append(value)
+            bisect.insort(self._sorted, value)
+            self._sum += value
+
+        self.count += 1
+
+        if not self._sorted:
+            for values in self.stats.values():
+                values.append(math.nan)
+            return
+
+        self.stats["mean"].append(self._sum / len(self._values))
+        self.stats["median"].append(percentile(self._sorted, 50))
+        self.stats["low"].append(percentile(self._sorted, PERCENTILES[0]))
+        self.stats["high"].append(percentile(self._sorted, PERCENTILES[1]))
+
+    def to_json(self):
+        return {
+            "size": self.size,
+            "count": self.count,
+            "values": list(self._values),
+            "stats": self.stats,
+        }
+
+    @classmethod
+    def from_json(cls, state):
+        return cls(state["size"], state["values"], state["count"],
+                   state["stats"])
+
+
+class Store:
+    def __init__(self, path, size):
+        check_size(size)
+        self.path = path
+        self.size = size
+        self._windows = {}
+        self._digests = {}
+
+        try:
+            with open(path) as state_file:
+                state = json.load(state_file)
+        except FileNotFoundError:
+            return
+
+        for key, window in state.items():
+            if window["size"] == size:
+                self._windows[key] = Window.from_json(window)
+                self._digests[key] = window["digest"]
+
+    def update(self, key, y):
+        window = self._windows.get(key)
+
+        if (window is None or window.count > len(y)
+                or digest(y[:window.count]) != self._digests[key]):
+            window = Window(self.size)
+
+        for value in y[window.count:]:
+            window.append(value)
+
+        self._windows[key] = window
+        self._digests[key] = digest(y)
+
+        return {k: np.array(v) for k, v in window.stats.items()}
+
+    def save(self):
+        state = {}
+
+        for key, window in self._windows.items():
+            state[key] = window.to_json()
+            state[key]["digest"] = self._digests[key]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_file(self.path, json.dumps(state))
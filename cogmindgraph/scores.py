@@ -0,0 +1,289 @@
+import collections
+import copy
+import itertools
+import re
+
+import numpy as np
+
+try:
+    from .gen import archived_scoresheet_pb2 as scoresheet
+except ImportError:
+    scoresheet = None
+
+
+XAXES = {
+    "time": (lambda data: data.cumulative("time"),
+             "cumulative playing time (h)"),
+    "turns": (lambda data: data.cumulative("turns"),
+              "cumulative turns taken"),
+    "actions": (lambda data: data.cumulative("actions"),
+                "cumulative actions taken"),
+    "runs": (lambda data: data.count(), "run count"),
+    "date": (lambda data: data["date"], "date"),
+}
+
+LOSS_ENDINGS = {
+    "CORE DESTROYED": "",
+    "SYSTEM CORRUPTED": "C",
+    "CRUSHED BY SINGULARITY!": "!",
+}
+
+
+class Data:
+    def __init__(self, items, xaxis, rolling=None):
+        self._items = list(sorted(items, key=lambda x: x["date"]))
+        self._xaxis = xaxis
+        self._cache = {}
+        self._rolling = rolling
+        self._graph = None
+
+    def with_xaxis(self, xaxis):
+        data = copy.copy(self)
+        data._xaxis = xaxis
+        return data
+
+    def with_graph(self, graph):
+        data = copy.copy(self)
+        data._graph = graph
+        return data
+
+    def select(self, field, where=lambda x: True):
+        return (x[field] for x in self._items if where(x))
+
+    def __getitem__(self, field):
+        return self._cached(("field", field),
+                            lambda: self._to_array(self.select(field)))
+
+    def array(self, *args, **kwargs):
+        return self._to_array(self.select(*args, **kwargs))
+
+    def cumulative(self, *args, **kwargs):
+        values = self.select(*args, **kwargs)
+        values = (x if np.isfinite(x) else 0 for x in values)
+        result = itertools.accumulate(values)
+        return self._to_array(result)
+
+    def max(self, *args, **kwargs):
+        result = itertools.accumulate(self.select(*args, **kwargs), max)
+        return self._to_array(result)
+
+    def count(self):
+        return self._to_array(range(1, len(self._items) + 1))
+
+    def xaxis(self):
+        return self._cached(("xaxis", self._xaxis),
+                            lambda: XAXES[self._xaxis][0](self))
+
+    def xlabel(self):
+        return XAXES[self._xaxis][1]
+
+    def rolling(self, y):
+        if self._rolling is None or self._graph is None:
+            return None
+
+        return self._rolling.update(self._graph, y)
+
+    def _cached(self, key, func):
+        if key not in self._cache:
+            array = func()
+            array.flags.writeable = False
+            self._cache[key] = array
+
+        return self._cache[key]
+
+    def _to_array(self, generator):
+        return np.array(list(generator))
+
+
+def parse_filename(filename):
+    parts = re.search(r"(.*)-(\d\d)(\d\d)(\d\d)-(\d\d)(\d\d)(\d\d)"
+                      r"(?:-\d)?--?\d+(?:_w\d*)?(\++)?\.txt$", filename)
+
+    if not parts:
+        raise ValueError("Unrecognized scoresheet filename")
+
+    player = parts[1].replace("/", "").replace(".", "")
+    extended = parts[8]
+
+    date = np.datetime64("20{}-{}-{}T{}:{}:{}"
+                         .format(*parts.groups()[1:7]))
+
+    return player, extended, date
+
+
+def canonical_name(player):
+    return player.lower().replace(".", "")
+
+
+def parse_game_text(name, read, select=None):
+    try:
+        player, extended, date = parse_filename(name)
+    except ValueError as e:
+        print(f"Warning: {name}: {e}")
+        return
+
+    if select and not select(player):
+        return
+
+    return player, parse_fields(read(), date, extended)
+
+
+def parse_game_legacy(path, select=None):
+    return parse_game_text(path.name, path.read_text, select)
+
+
+def parse_game_packed(item, select=None):
+    name, content = item
+    return parse_game_text(name, content.decode, select)
+
+
+def parse_game_pb(path, select=None):
+    with open(path, "rb") as game_file:
+        return parse_game_pb_bytes(game_file.read(), select)
+
+
+def parse_game_pb_bytes(content, select=None):
+    game = scoresheet.ArchivedPostScoresheetRequest()
+    game.ParseFromString(content)
+
+    sheet = game.scoresheet
+    stats = sheet.stats
+    player = sheet.header.player_name
+    _, extended, date = parse_filename(sheet.header.filename)
+
+    if select and not select(player):
+        return
+
+    if not sheet.stats.exploration.spaces_moved.average_speed:
+        return
+
+    win, ending = parse_ending(sheet.header.run_result.upper(),
+                               sheet.game.win_type)
+
+    time = sum(int(x) * 60**(-i)
+               for i, x in enumerate(sheet.game.run_time.split(":")))
+
+    fields = {
+        "date": date,
+        "extended": extended,
+        "win": win,
+        "ending": ending,
+        "version": re.match(r"(\w+ \d+).*", sheet.header.version)[1],
+        "easy": sheet.header.difficulty,
+        "score": sheet.performance.total_score,
+        "value": sheet.performance.value_destroyed.points,
+        "time": time,
+        "turns": stats.exploration.turns_passed,
+        "actions": stats.actions.total.overall,
+        "lore": sheet.game.lore_percent,
+        "gallery": sheet.game.gallery_percent,
+        "achievements": sheet.game.achievement_percent,
+        "speed": 100*100 / stats.exploration.spaces_moved.average_speed,
+        "regions": sheet.performance.regions_visited.count,
+        "prototypes": sheet.performance.prototypes_identified.count,
+        "parts": sheet.peak_state.rating,
+        "slots": stats.build.average_slot_usage_percent.overall,
+        "damage": stats.combat.damage_inflicted.overall,
+        "melee": stats.combat.damage_inflicted.melee,
+        "em": stats.combat.damage_inflicted.electromagnetic,
+        "core": stats.combat.core_remaining_percent,
+        "hacking": sheet.best_states.offensive_hacking,
+        "capacity": stats.build.largest_inventory_capacity.average_capacity,
+        "influence": stats.alert.peak_influence.average_influence,
+        "best_group": stats.allies.total_allies.highest_rated_group,
+    }
+
+    return player, fields
+
+
+def legacy_score_files(path, exclude=()):
+    score_files = path.glob("*-*-*-*.txt")
+    return (x for x in score_files
+            if "_log" not in x.name and x.name not in exclude)
+
+
+def parse_games(score_files, select=None, func=parse_game_legacy):
+    for path in score_files:
+        result = func(path, select)
+
+        if not result:
+            continue
+
+        player, game = result
+
+        if game["time"] > 0 and game["score"] > 750:
+            yield player, game
+
+
+def parse_ending(ending, win_type):
+    if ending == "SELF-DESTRUCTED":
+        return -1, ""
+
+    if ending in LOSS_ENDINGS:
+        return 0, LOSS_ENDINGS[ending]
+
+    if win_type < 0:
+        return 0, ""
+
+    if win_type > 0:
+        return 1, str(win_type)
+
+    return 1, ""
+
+
+def parse_fields(game, date, extended):
+    def find(pattern, default=np.nan, type=float):
+        match = re.search(pattern, game, re.DOTALL)
+        if match:
+            return type(match[1])
+
+        return default
+
+    win, ending = parse_ending(find(r"---\[ (.*) \]---", type=str),
+                               find(r"Win Type: (\d+)", type=int))
+
+    return {
+        "date": date,
+        "extended": extended,
+        "win": win,
+        "ending": ending,
+        "version": find(r"Cogmind - (\w+ \d+)", type=str),
+        "easy": find(r"Easy Mode: (\d+)", 0),
+        "score": find(r"\s+TOTAL SCORE: (-?\d+)"),
+        "value": find(r"Value Destroyed \((\d+)\)"),
+        "time": find(r"Play Time: (\d+) min") / 60,
+        "turns": find(r"Turns Passed\s+(\d+)"),
+        "actions": find(r"Actions Taken\s+(\d+)"),
+        "lore": find(r"Lore%: (\d+)", 0),
+        "gallery": find(r"Gallery%: (\d+)", 0),
+        "achievements": find(r"Achievement%: (\d+)", 0),
+        "speed": find(r"Average Speed \(%\)\s+(\d+)"),
+        "regions": find(r"Regions Visited\s+(\d+)"),
+        "prototypes": find(r"Prototype IDs \((\d+)\)"),
+        "parts": find(r"Peak State.*?\[Rating: (\d+)\]", 0),
+        "slots": find(r"Average Slot Usage \(%\)\s+(\d+)"),
+        "damage": find(r"Damage Inflicted\s+(\d+)"),
+        "melee": find(r"Damage Inflicted.*?Melee\s+(\d+)"),
+        "em": find(r"Damage Inflicted.*?Electromagnetic\s+(\d+)"),
+        "core": find(r"Average Core Remaining \(%\)\s+(\d+)"),
+        "hacking": find(r"Offensive Hacking\s+(\d+)", 0),
+        "capacity": find(r"Average Capacity\s+(\d+)"),
+        "influence": find(r"Average Influence\s+(\d+)"),
+        "best_group": find(r"Highest-Rated Group\s+(\d+)"),
+    }
+
+
+def merge_aliases(scores):
+    Alias = collections.namedtuple("Alias", "name games")
+
+    def best_name(aliases):
+        return max(aliases, key=lambda x: len(x.games)).name
+
+    def merge_games(aliases):
+        return sum((x.games for x in aliases), [])
+
+    players = collections.defaultdict(list)
+    for player, games in scores.items():
+        players[canonical_name(player)].append(Alias(player, games))
+
+    return {best_name(x): merge_games(x) for x in players.values()}
@@ -0,0 +1,278 @@
+import collections
+import concurrent.futures
+import http.server
+import os
+import re
+import threading
+import urllib.parse
+
+from . import graphs
+from .files import write_file
+
+
+CONTENT_TYPES = {
+    "css": "text/css; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+    "js": "text/javascript; charset=utf-8",
+    "json": "application/json",
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+class MemoryCache:
+    def __init__(self, max_bytes):
+        self._items = collections.OrderedDict()
+        self._size = 0
+        self._max_bytes = max_bytes
+
+    def get(self, key):
+        content = self._items.get(key)
+
+        if content is not None:
+            self._items.move_to_end(key)
+
+        return content
+
+    def put(self, key, content):
+        self._remove(key)
+
+        if len(content) > self._max_bytes:
+            return
+
+        self._items[key] = content
+        self._size += len(content)
+
+        while self._size > self._max_bytes:
+            self._remove(next(iter(self._items)))
+
+    def _remove(self, key):
+        if key in self._items:
+            self._size -= len(self._items.pop(key))
+
+
+class DiskCache:
+    def __init__(self, path, max_bytes):
+        path.mkdir(parents=True, exist_ok=True)
+
+        files = (x for x in path.iterdir()
+                 if x.is_file() and not x.name.startswith("."))
+        files = sorted(files, key=lambda x: x.stat().st_mtime)
+
+        self._path = path
+        self._lock = threading.Lock()
+        self._sizes = collections.OrderedDict(
+            (x.name, x.stat().st_size) for x in files)
+        self._size = sum(self._sizes.values())
+        self._max_bytes = max_bytes
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._sizes:
+                return None
+
+            self._sizes.move_to_end(key)
+
+        path = self._path / key
+
+        try:
+            os.utime(path)
+            return path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(key)
+
+            return None
+
+    def put(self, key, content):
+        if len(content) > self._max_bytes:
+            return
+
+        write_file(self._path / key, content)
+
+        with self._lock:
+            self._forget(key)
+            self._sizes[key] = len(content)
+            self._size += len(content)
+            evicted = []
+
+            while self._size > self._max_bytes:
+                evicted.append(next(iter(self._sizes)))
+                self._forget(evicted[-1])
+
+        for key in evicted:
+            (self._path / key).unlink(missing_ok=True)
+
+    def _forget(self, key):
+        if key in self._sizes:
+            self._size -= self._sizes.pop(key)
+
+
+class GraphServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, datasets, render, pool, args):
+        super().__init__(address, RequestHandler)
+        self.datasets = datasets
+        self.args = args
+        self._render = render
+        self._pool = pool
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._memory_cache = MemoryCache(args.memory_cache * 2**20)
+        self._disk_cache = DiskCache(
+            args.output / "cache" / f"{args.renderer}-{args.size}",
+            args.disk_cache * 2**20)
+
+    def graph(self, player, graph, image_format, xaxis, thumbnail=False):
+        data, entry = self.datasets[player]
+        suffix = f"-thumb{self.args.thumbnail_size}" if thumbnail else ""
+        key = f"{entry['hash']}-{xaxis}-{graph}{suffix}.{image_format}"
+
+        with self._lock:
+            content = self._memory_cache.get(key)
+            future = self._pending.get(key)
+
+        if content is None and future is None:
+            content = self._disk_cache.get(key)
+
+            with self._lock:
+                if content is not None:
+                    self._memory_cache.put(key, content)
+                else:
+                    content = self._memory_cache.get(key)
+                    future = self._pending.get(key)
+
+                if content is None and future is None:
+                    size = self.args.size
+
+                    if thumbnail:
+                        size = self.args.thumbnail_size
+
+                    future = self._pool.submit(
+                        self._render, (player, data.with_xaxis(xaxis),
+                                       [graph], image_format, size,
+                                       self.args.renderer))
+                    self._pending[key] = future
+
+        if content is not None:
+            return content
+
+        try:
+            content = future.result()[graph]
+        finally:
+            with self._lock:
+                is_owner = self._pending.get(key) is future
+
+                if is_owner:
+                    del self._pending[key]
+
+                    if content is not None:
+                        self._memory_cache.put(key, content)
+
+        if is_owner:
+            self._disk_cache.put(key, content)
+
+        return content
+
+
+class RequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        from . import html
+
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        args = self.server.args
+        views = args.xaxis if len(args.xaxis) > 1 else []
+        xaxis = args.xaxis[0]
+
+        if views:
+            if path == "/":
+                self.redirect(f"/{xaxis}/")
+                return
+
+            match = re.fullmatch(r"/(\w+)(/.*)", path)
+            if not match or match[1] not in views:
+                self.send_error(404)
+                return
+
+            xaxis, path = match.groups()
+
+        if path == "/":
+            self.respond("html", html.build_index(views, xaxis).encode())
+            return
+
+        if path == "/index.js":
+            self.respond("js", html.INDEX_SCRIPT.encode())
+            return
+
+        if path in ("/manifest.json", "/manifest.js"):
+            entries = [x[1] for x in self.server.datasets.values()]
+            manifest = html.build_manifest(entries)
+            content_type = path.rsplit(".", 1)[1]
+
+            if content_type == "js":
+                manifest = html.build_manifest_script(manifest)
+
+            self.respond(content_type, manifest.encode())
+            return
+
+        if path == "/style.css":
+            style = html.build_style(args.thumbnail_size)
+            self.respond("css", style.encode())
+            return
+
+        match = re.fullmatch(r"/([^/]+)(/?)", path)
+        if match and match[1] in self.server.datasets:
+            if not match[2]:
+                parts = urllib.parse.urlsplit(self.path)
+                self.redirect(urllib.parse.urlunsplit(
+                    ("", "", f"{parts.path}/", parts.query, "")))
+                return
+
+            page = html.build_player_index(match[1], args.format, views,
+                                           xaxis)
+            self.respond("html", page.encode())
+            return
+
+        match = re.fullmatch(r"/([^/]+)/(thumbs/)?(\w+)\.(svg|png)", path)
+        if (match and match[1] in self.server.datasets
+                and match[3] in graphs.graphs):
+            player, thumbnail, graph, image_format = match.groups()
+
+            try:
+                content = self.server.graph(player, graph, image_format,
+                                            xaxis, thumbnail=bool(thumbnail))
+            except Exception as e:
+                self.log_error("Rendering %s failed: %r", path, e)
+                self.send_error(500)
+                return
+
+            self.respond(image_format, content)
+            return
+
+        self.send_error(404)
+
+    def redirect(self, location):
+        self.send_response(301)
+        self.send_header("Location", location)
+        self.end_headers()
+
+    def respond(self, content_type, content):
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[content_type])
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def serve(datasets, render, args):
+    with concurrent.futures.ProcessPoolExecutor() as pool:
+        server = GraphServer(("", args.serve), datasets, render, pool, args)
+        print(f"Serving {len(datasets)} players on port {args.serve}")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,657 @@
+import itertools
+import math
+import xml.sax.saxutils
+
+import matplotlib
+import matplotlib.colors
+import matplotlib.ticker
+import matplotlib.transforms
+import numpy as np
+
+
+FONT_FAMILY = "DejaVu Sans, Bitstream Vera Sans, sans-serif"
+ASCENT = 0.76
+DESCENT = 0.24
+LINE_HEIGHT = 0.97
+CHAR_WIDTH = 0.57
+
+TICK_LENGTH = 3.5
+TICK_PAD = 3.5
+LABEL_PAD = 4.0
+TITLE_PAD = 6.0
+
+DASHES = {
+    "-": None,
+    "--": (3.7, 1.6),
+    ":": (1, 1.65),
+    "-.": (6.4, 1.6, 1, 1.6),
+}
+
+
+def color(value):
+    if value == "none":
+        return "none"
+
+    return matplotlib.colors.to_hex(value)
+
+
+def dasharray(linestyle, linewidth):
+    pattern = DASHES[linestyle]
+
+    if pattern is None:
+        return "none"
+
+    return ",".join(f"{x * linewidth:g}" for x in pattern)
+
+
+def text_width(content, size):
+    return CHAR_WIDTH * size * len(content)
+
+
+class Axis:
+    def __init__(self):
+        self._locator = matplotlib.ticker.MaxNLocator(
+            9, steps=[1, 2, 2.5, 5, 10])
+        self._formatter = matplotlib.ticker.FuncFormatter(
+            lambda value, pos: f"{value:g}")
+        self._data = (math.inf, -math.inf)
+        self._view = None
+        self.auto = True
+
+    def set_major_formatter(self, formatter):
+        formatter.set_axis(self)
+        self._formatter = formatter
+
+    def set_major_locator(self, locator):
+        self._locator = locator
+
+    def update_data(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+
+        if len(values):
+            self._data = (min(self._data[0], values.min()),
+                          max(self._data[1], values.max()))
+
+    def get_view_interval(self):
+        if self.auto or self._view is None:
+            return self._autoscale()
+
+        return self._view
+
+    def set_view_interval(self, low=None, high=None):
+        current_low, current_high = self.get_view_interval()
+
+        if low is None:
+            low = current_low
+
+        if high is None:
+            high = current_high
+
+        self._view = (low, high)
+        self.auto = False
+
+    def freeze(self):
+        self._view = self.get_view_interval()
+        self.auto = False
+
+    def set_ticks(self, ticks):
+        low, high = self.get_view_interval()
+        self._locator = matplotlib.ticker.FixedLocator(ticks)
+        self._view = (min(low, min(ticks)), max(high, max(ticks)))
+
+    def get_ticks(self):
+        return np.asarray(self._locator.tick_values(
+            *self.get_view_interval()))
+
+    def visible_ticks(self):
+        low, high = self.get_view_interval()
+        tolerance = 1e-10 * (high - low)
+        ticks = [x for x in self.get_ticks()
+                 if low - tolerance <= x <= high + tolerance]
+        return ticks, self._formatter.format_ticks(ticks)
+
+    def _autoscale(self):
+        low, high = self._data
+
+        if not np.isfinite([low, high]).all():
+            return 0.0, 1.0
+
+        low, high = matplotlib.transforms.nonsingular(low, high,
+                                                      expander=0.05)
+        margin = 0.05 * (high - low)
+        return low - margin, high + margin
+
+
+class Figure:
+    transFigure = "figure"
+
+    def __init__(self):
+        width, height = matplotlib.rcParams["figure.figsize"]
+        self.width = 72 * width
+        self.height = 72 * height
+        self.title = None
+        self.axes = Axes(self)
+
+    def get_size_inches(self):
+        return np.array([self.width, self.height]) / 72
+
+    def suptitle(self, title, fontsize=12):
+        self.title = (title, fontsize)
+
+    def to_svg(self):
+        elements = [
+            '<?xml version="1.0" encoding="utf-8" standalone="no"?>',
+            f'<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+            f'width="{self.width:g}pt" height="{self.height:g}pt" '
+            f'viewBox="0 0 {self.width:g} {self.height:g}">',
+            f'<rect width="{self.width:g}" height="{self.height:g}" '
+            f'style="fill:#ffffff"/>',
+        ]
+
+        elements.extend(self.axes.draw())
+
+        if self.title:
+            title, size = self.title
+            elements.append(text_element(
+                self.width / 2, 0.02 * self.height + ASCENT * size,
+                title, size, anchor="middle"))
+
+        elements.append("</svg>")
+        return "\n".join(elements) + "\n"
+
+
+class PropCycler:
+    def __init__(self):
+        self.prop_cycler = itertools.cycle(
+            matplotlib.rcParams["axes.prop_cycle"])
+
+    def next_color(self):
+        return next(self.prop_cycler)["color"]
+
+
+class Axes:
+    def __init__(self, figure):
+        self._figure = figure
+        self._get_lines = PropCycler()
+        self._artists = []
+        self._legend = None
+        self._title = None
+        self._xlabel = None
+        self._ylabel = None
+        self.xaxis = Axis()
+        self.yaxis = Axis()
+
+        rc = matplotlib.rcParams
+        self.left = rc["figure.subplot.left"] * figure.width
+        self.right = rc["figure.subplot.right"] * figure.width
+        self.top = (1 - rc["figure.subplot.top"]) * figure.height
+        self.bottom = (1 - rc["figure.subplot.bottom"]) * figure.height
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        raise NotImplementedError(f"Axes.{name}")
+
+    def get_figure(self):
+        return self._figure
+
+    def set_title(self, title):
+        self._title = title
+
+    def set_xlabel(self, label):
+        self._xlabel = label
+
+    def set_ylabel(self, label):
+        self._ylabel = label
+
+    def set_xlim(self, xmin=None, xmax=None):
+        self.xaxis.set_view_interval(xmin, xmax)
+
+    def set_ylim(self, ymin=None, ymax=None):
+        self.yaxis.set_view_interval(ymin, ymax)
+
+    def set_yticks(self, ticks):
+        self.yaxis.set_ticks(ticks)
+
+    def get_xticks(self):
+        return self.xaxis.get_ticks()
+
+    def get_yticks(self):
+        return self.yaxis.get_ticks()
+
+    def autoscale(self, enable=True):
+        if not enable:
+            self.xaxis.freeze()
+            self.yaxis.freeze()
+
+    def scatter(self, x, y, s=None, color=None, facecolors=None,
+                linewidths=None, linestyle="-", label=None, clip_on=True):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        valid = np.isfinite(x) & np.isfinite(y)
+
+        if color is None:
+            color = self._get_lines.next_color()
+
+        if s is None:
+            s = matplotlib.rcParams["lines.markersize"]**2
+
+        if linewidths is None:
+            linewidths = matplotlib.rcParams["patch.linewidth"]
+
+        self._add(Scatter(x[valid], y[valid], s, color,
+                          color if facecolors is None else facecolors,
+                          linewidths, linestyle, label, clip_on), zorder=1)
+
+    def plot(self, x, y, fmt="-", color=None, linestyle=None,
+             linewidth=None, label=None, zorder=2):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        if color is None:
+            color = self._get_lines.next_color()
+
+        if linewidth is None:
+            linewidth = matplotlib.rcParams["lines.linewidth"]
+
+        self._add(Line(x, y, color, linestyle or fmt, linewidth, label),
+                  zorder=zorder)
+
+    def fill_between(self, x, y1, y2, color=None, alpha=1, linewidth=0,
+                     label=None, zorder=1):
+        x = np.asarray(x, dtype=float)
+        y1 = np.asarray(y1, dtype=float)
+        y2 = np.asarray(y2, dtype=float)
+
+        if color is None:
+            color = self._get_lines.next_color()
+
+        self._add(Band(x, y1, y2, color, alpha, label), zorder=zorder)
+
+    def axvline(self, x, linewidth=None, color=None, zorder=2):
+        if linewidth is None:
+            linewidth = matplotlib.rcParams["lines.linewidth"]
+
+        self._artists.append((zorder, VLine(x, color or "C0", linewidth)))
+
+    def annotate(self, content, xy, xycoords="data", xytext=(0, 0),
+                 textcoords="offset points", size=10, weight="normal",
+                 rotation=0, horizontalalignment="left", va="baseline",
+                 zorder=3):
+        if textcoords != "offset points":
+            raise NotImplementedError(f"textcoords={textcoords}")
+
+        self._artists.append((zorder, Annotation(
+            content, xy, xycoords, xytext, size, weight, rotation,
+            horizontalalignment, va)))
+
+    def get_legend_handles_labels(self):
+        handles = [x for _, x in self._artists
+                   if getattr(x, "label", None)
+                   and not x.label.startswith("_")]
+        return handles, [x.label for x in handles]
+
+    def legend(self, loc="upper right", bbox_to_anchor=(1, 1),
+               bbox_transform=None, borderaxespad=0.5, prop=None):
+        if loc != "upper right":
+            raise NotImplementedError(f"loc={loc}")
+
+        size = (prop or {}).get("size", 10)
+        self._legend = Legend(self.get_legend_handles_labels()[0],
+                              bbox_to_anchor, bbox_transform,
+                              borderaxespad, size)
+
+    def transform(self, x, y, coords="data"):
+        if coords == "axes fraction":
+            return (self.left + x * (self.right - self.left),
+                    self.bottom - y * (self.bottom - self.top))
+
+        if coords == "figure fraction":
+            return (x * self._figure.width,
+                    (1 - y) * self._figure.height)
+
+        xmin, xmax = self.xaxis.get_view_interval()
+        ymin, ymax = self.yaxis.get_view_interval()
+        return (self.left + (x - xmin) / (xmax - xmin)
+                * (self.right - self.left),
+                self.bottom - (y - ymin) / (ymax - ymin)
+                * (self.bottom - self.top))
+
+    def draw(self):
+        width = self.right - self.left
+        height = self.bottom - self.top
+
+        elements = [
+            '<defs><clipPath id="axes">'
+            f'<rect x="{self.left:.2f}" y="{self.top:.2f}" '
+            f'width="{width:.2f}" height="{height:.2f}"/>'
+            '</clipPath></defs>',
+            f'<rect x="{self.left:.2f}" y="{self.top:.2f}" '
+            f'width="{width:.2f}" height="{height:.2f}" '
+            f'style="fill:#ffffff"/>',
+        ]
+
+        artists = self._artists + [(1.5, AxisDecorations()),
+                                   (2.5, Spines())]
+
+        if self._legend:
+            artists.append((5, self._legend))
+
+        for _, artist in sorted(artists, key=lambda x: x[0]):
+            elements.extend(artist.draw(self))
+
+        if self._title:
+            elements.append(text_element(
+                self.left + width / 2, self.top - TITLE_PAD,
+                self._title, 12, anchor="middle"))
+
+        return elements
+
+    def _add(self, artist, zorder):
+        self._artists.append((zorder, artist))
+        self.xaxis.update_data(artist.x)
+        self.yaxis.update_data(artist.y)
+
+
+def text_element(x, y, content, size, anchor="start", weight="normal",
+                 rotation=0):
+    transform = ""
+    if rotation:
+        transform = f' transform="rotate({-rotation:g} {x:.2f} {y:.2f})"'
+
+    return (f'<text x="{x:.2f}" y="{y:.2f}"{transform} '
+            f'style="font-family:{FONT_FAMILY};font-size:{size:g}px;'
+            f'font-weight:{weight};text-anchor:{anchor};fill:#000000">'
+            f'{xml.sax.saxutils.escape(str(content))}</text>')
+
+
+def line_style(stroke, linewidth, linestyle):
+    return (f"fill:none;stroke:{color(stroke)};stroke-width:{linewidth:g};"
+            f"stroke-dasharray:{dasharray(linestyle, linewidth)}")
+
+
+def marker_element(x, y, size, edgecolor, facecolor, linewidth, linestyle):
+    return (f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{math.sqrt(size) / 2:.2f}" '
+            f'style="fill:{color(facecolor)};stroke:{color(edgecolor)};'
+            f'stroke-width:{linewidth:g};'
+            f'stroke-dasharray:{dasharray(linestyle, linewidth)}"/>')
+
+
+class Scatter:
+    def __init__(self, x, y, size, edgecolor, facecolor, linewidth,
+                 linestyle, label, clip_on):
+        self.x = x
+        self.y = y
+        self.size = size
+        self.edgecolor = edgecolor
+        self.facecolor = facecolor
+        self.linewidth = linewidth
+        self.linestyle = linestyle
+        self.label = label
+        self.clip_on = clip_on
+
+    def draw(self, ax):
+        clip = ' clip-path="url(#axes)"' if self.clip_on else ""
+        yield f"<g{clip}>"
+
+        for x, y in zip(self.x, self.y):
+            yield self.marker(*ax.transform(x, y))
+
+        yield "</g>"
+
+    def marker(self, x, y):
+        return marker_element(x, y, self.size, self.edgecolor,
+                              self.facecolor, self.linewidth, self.linestyle)
+
+    def legend_handle(self, start, end, y, size):
+        return self.marker((start + end) / 2, y)
+
+
+class Line:
+    def __init__(self, x, y, stroke, linestyle, linewidth, label):
+        self.x = x
+        self.y = y
+        self.stroke = stroke
+        self.linestyle = linestyle
+        self.linewidth = linewidth
+        self.label = label
+
+    def draw(self, ax):
+        valid = np.isfinite(self.x) & np.isfinite(self.y)
+
+        for is_valid, group in itertools.groupby(
+                zip(valid, self.x, self.y), key=lambda x: x[0]):
+            points = [ax.transform(x, y) for _, x, y in group]
+
+            if is_valid and len(points) > 1:
+                path = " L ".join(f"{x:.2f} {y:.2f}" for x, y in points)
+                yield (f'<path d="M {path}" clip-path="url(#axes)" '
+                       f'style="{self.style()}"/>')
+
+    def style(self):
+        return line_style(self.stroke, self.linewidth, self.linestyle)
+
+    def legend_handle(self, start, end, y, size):
+        return (f'<path d="M {start:.2f} {y:.2f} L {end:.2f} {y:.2f}" '
+                f'style="{self.style()}"/>')
+
+
+class Band:
+    def __init__(self, x, y1, y2, fill, alpha, label):
+        self.x = x
+        self.y1 = y1
+        self.y2 = y2
+        self.y = np.concatenate([y1, y2])
+        self.fill = fill
+        self.alpha = alpha
+        self.label = label
+
+    def draw(self, ax):
+        valid = (np.isfinite(self.x) & np.isfinite(self.y1)
+                 & np.isfinite(self.y2))
+
+        for is_valid, group in itertools.groupby(
+                zip(valid, self.x, self.y1, self.y2), key=lambda x: x[0]):
+            group = list(group)
+
+            if is_valid and len(group) > 1:
+                points = ([ax.transform(x, y) for _, x, y, _ in group]
+                          + [ax.transform(x, y) for _, x, _, y
+                             in reversed(group)])
+                path = " L ".join(f"{x:.2f} {y:.2f}" for x, y in points)
+                yield (f'<path d="M {path} Z" clip-path="url(#axes)" '
+                       f'style="{self.style()}"/>')
+
+    def style(self):
+        return (f"fill:{color(self.fill)};fill-opacity:{self.alpha:g};"
+                f"stroke:none")
+
+    def legend_handle(self, start, end, y, size):
+        height = 0.7 * size
+        return (f'<rect x="{start:.2f}" y="{y - height / 2:.2f}" '
+                f'width="{end - start:.2f}" height="{height:.2f}" '
+                f'style="{self.style()}"/>')
+
+
+class VLine:
+    def __init__(self, x, stroke, linewidth):
+        self.x = x
+        self.stroke = stroke
+        self.linewidth = linewidth
+
+    def draw(self, ax):
+        x, _ = ax.transform(self.x, 0)
+        style = line_style(self.stroke, self.linewidth, "-")
+        yield (f'<path d="M {x:.2f} {ax.bottom:.2f} L {x:.2f} {ax.top:.2f}" '
+               f'clip-path="url(#axes)" style="{style}"/>')
+
+
+class Annotation:
+    def __init__(self, content, xy, xycoords, offset, size, weight,
+                 rotation, horizontalalignment, verticalalignment):
+        self.content = str(content)
+        self.xy = xy
+        self.xycoords = xycoords
+        self.offset = offset
+        self.size = size
+        self.weight = weight
+        self.rotation = rotation
+        self.horizontalalignment = horizontalalignment
+        self.verticalalignment = verticalalignment
+
+    def draw(self, ax):
+        x, y = ax.transform(*self.xy, coords=self.xycoords)
+
+        if not np.isfinite([x, y]).all():
+            return
+
+        x += self.offset[0]
+        y -= self.offset[1]
+
+        if self.rotation % 180 == 0:
+            x, y, anchor = self._align(x, y)
+        else:
+            x, y, anchor = self._align_vertical(x, y)
+
+        yield text_element(x, y, self.content, self.size, anchor=anchor,
+                           weight=self.weight, rotation=self.rotation)
+
+    def _align(self, x, y):
+        anchor = {"left": "start", "center": "middle",
+                  "right": "end"}[self.horizontalalignment]
+        y += {"top": ASCENT, "center": (ASCENT - DESCENT) / 2,
+              "bottom": -DESCENT, "baseline": 0}[self.verticalalignment] \
+            * self.size
+        return x, y, anchor
+
+    def _align_vertical(self, x, y):
+        clockwise = self.rotation % 360 == 270
+        anchor = {"top": "start" if clockwise else "end",
+                  "center": "middle",
+                  "bottom": "end" if clockwise else "start",
+                  "baseline": "middle"}[self.verticalalignment]
+        near, far = (DESCENT, ASCENT) if clockwise else (ASCENT, DESCENT)
+        x += {"left": near, "center": (near - far) / 2,
+              "right": -far}[self.horizontalalignment] * self.size
+        return x, y, anchor
+
+
+class AxisDecorations:
+    def draw(self, ax):
+        tick_style = line_style("k", 0.8, "-")
+        size = 10
+
+        ticks, labels = ax.xaxis.visible_ticks()
+        for tick, label in zip(ticks, labels):
+            x, _ = ax.transform(tick, 0)
+            yield (f'<path d="M {x:.2f} {ax.bottom:.2f} '
+                   f'L {x:.2f} {ax.bottom + TICK_LENGTH:.2f}" '
+                   f'style="{tick_style}"/>')
+            yield text_element(
+                x, ax.bottom + TICK_LENGTH + TICK_PAD + ASCENT * size,
+                label, size, anchor="middle")
+
+        label_width = 0
+        ticks, labels = ax.yaxis.visible_ticks()
+        for tick, label in zip(ticks, labels):
+            _, y = ax.transform(0, tick)
+            yield (f'<path d="M {ax.left:.2f} {y:.2f} '
+                   f'L {ax.left - TICK_LENGTH:.2f} {y:.2f}" '
+                   f'style="{tick_style}"/>')
+            yield text_element(
+                ax.left - TICK_LENGTH - TICK_PAD,
+                y + (ASCENT - DESCENT) / 2 * size, label, size, anchor="end")
+            label_width = max(label_width, text_width(label, size))
+
+        if ax._xlabel:
+            y = (ax.bottom + TICK_LENGTH + TICK_PAD + size + LABEL_PAD
+                 + ASCENT * size)
+            yield text_element((ax.left + ax.right) / 2, y, ax._xlabel,
+                               size, anchor="middle")
+
+        if ax._ylabel:
+            x = (ax.left - TICK_LENGTH - TICK_PAD - label_width - LABEL_PAD
+                 - DESCENT * size)
+            yield text_element(x, (ax.top + ax.bottom) / 2, ax._ylabel,
+                               size, anchor="middle", rotation=90)
+
+
+class Spines:
+    def draw(self, ax):
+        yield (f'<rect x="{ax.left:.2f}" y="{ax.top:.2f}" '
+               f'width="{ax.right - ax.left:.2f}" '
+               f'height="{ax.bottom - ax.top:.2f}" '
+               f'style="{line_style("k", 0.8, "-")}"/>')
+
+
+class Legend:
+    BORDER_PAD = 0.4
+    LABEL_SPACING = 0.5
+    HANDLE_LENGTH = 2.0
+    HANDLE_TEXT_PAD = 0.8
+
+    def __init__(self, handles, anchor, transform, borderaxespad, size):
+        self.handles = handles
+        self.anchor = anchor
+        self.transform = transform
+        self.borderaxespad = borderaxespad
+        self.size = size
+
+    def draw(self, ax):
+        if not self.handles:
+            return
+
+        size = self.size
+        coords = ("figure fraction" if self.transform == "figure"
+                  else "axes fraction")
+        right, top = ax.transform(*self.anchor, coords=coords)
+        right -= self.borderaxespad * size
+        top += self.borderaxespad * size
+
+        label_width = max(text_width(x.label, size) for x in self.handles)
+        width = size * (2 * self.BORDER_PAD + self.HANDLE_LENGTH
+                        + self.HANDLE_TEXT_PAD) + label_width
+        height = size * (2 * self.BORDER_PAD
+                         + LINE_HEIGHT * len(self.handles)
+                         + self.LABEL_SPACING * (len(self.handles) - 1))
+        left = right - width
+
+        yield (f'<rect x="{left:.2f}" y="{top:.2f}" width="{width:.2f}" '
+               f'height="{height:.2f}" rx="{0.2 * size:g}" '
+               f'style="fill:#ffffff;fill-opacity:0.8;stroke:#cccccc;'
+               f'stroke-width:1"/>')
+
+        for i, handle in enumerate(self.handles):
+            x = left + self.BORDER_PAD * size
+            y = top + size * (self.BORDER_PAD + LINE_HEIGHT / 2
+                              + i * (LINE_HEIGHT + self.LABEL_SPACING))
+            handle_end = x + self.HANDLE_LENGTH * size
+
+            yield handle.legend_handle(x, handle_end, y, size)
+            yield text_element(
+                handle_end + self.HANDLE_TEXT_PAD * size,
+                y + (ASCENT - DESCENT) / 2 * size, handle.label, size)
+
+
+def plot(func, data, player, path, formatter):
+    x = data.xaxis()
+
+    if np.issubdtype(x.dtype, np.datetime64):
+        raise NotImplementedError("date axes are not supported")
+
+    fig = Figure()
+    ax = fig.axes
+    fig.suptitle(f"{player}'s Cogmind progression", fontsize=8)
+    ax.set_xlabel(data.xlabel())
+    ax.yaxis.set_major_formatter(formatter)
+    ax.xaxis.set_major_formatter(formatter)
+
+    func(ax, data)
+
+    ax.set_xlim(0, ax.get_xticks()[-1])
+    ax.set_ylim(ymax=ax.get_yticks()[-1])
+
+    with open(path, "w") as output:
+        output.write(fig.to_svg())
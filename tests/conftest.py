@@ -0,0 +1,75 @@
+import datetime
+
+import numpy as np
+import pytest
+
+
+SCORESHEET = """Cogmind - Beta {version}
+---[ {ending} ]---
+Win Type: {win_type}
+Easy Mode: {easy}
+   TOTAL SCORE: {score}
+Value Destroyed ({value})
+Play Time: {time} min
+Turns Passed   {turns}
+Actions Taken   {actions}
+Lore%: {lore}
+Gallery%: {gallery}
+Achievement%: {achievements}
+Average Speed (%)   {speed}
+Regions Visited   {regions}
+Prototype IDs ({prototypes})
+Peak State [Rating: {parts}]
+Average Slot Usage (%)   {slots}
+Damage Inflicted   {damage}
+  Melee   {melee}
+  Electromagnetic   {em}
+Average Core Remaining (%)   {core}
+Offensive Hacking   {hacking}
+Average Capacity   {capacity}
+Average Influence   {influence}
+Highest-Rated Group   {best_group}
+"""
+
+def make_scoresheet(rng, player, day):
+    win = rng.random() < 0.2
+    date = datetime.date(2021, 1, 1) + datetime.timedelta(days=day)
+    number = rng.integers(10000, 99999)
+    name = f"{player}-{date:%y%m%d}-120000-{number}.txt"
+    content = SCORESHEET.format(
+        version=rng.integers(10, 13),
+        ending="WIN" if win else "CORE DESTROYED",
+        win_type=rng.integers(0, 3) if win else -1,
+        easy=rng.choice([0, 0, 1, 2]),
+        score=rng.integers(1000, 40000),
+        value=rng.integers(0, 1000),
+        time=rng.integers(60, 600),
+        turns=rng.integers(5000, 50000),
+        actions=rng.integers(5000, 50000),
+        lore=rng.integers(0, 100),
+        gallery=rng.integers(0, 100),
+        achievements=rng.integers(0, 100),
+        speed=rng.integers(80, 200),
+        regions=rng.integers(5, 40),
+        prototypes=rng.integers(0, 60),
+        parts=rng.integers(10, 200),
+        slots=rng.integers(40, 100),
+        damage=rng.integers(0, 10000),
+        melee=rng.integers(0, 1000),
+        em=rng.integers(0, 1000),
+        core=rng.integers(20, 100),
+        hacking=rng.integers(0, 50),
+        capacity=rng.integers(0, 20),
+        influence=rng.integers(0, 3000),
+        best_group=rng.integers(0, 500),
+    )
+    return name, content.encode()
+
+
+@pytest.fixture(scope="session")
+def make_scoresheets():
+    def make(player="Ape", count=30, start=0, seed=0):
+        rng = np.random.default_rng(seed)
+        return [make_scoresheet(rng, player, start + x) for x in range(count)]
+
+    return make
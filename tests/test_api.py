@@ -0,0 +1,55 @@
+import pytest
+
+from cogmindgraph import api
+
+
+def test_ingest_skips_duplicates(make_scoresheets):
+    dataset = api.Dataset()
+    scoresheets = make_scoresheets(count=5)
+
+    assert dataset.ingest(scoresheets) == 5
+    assert dataset.ingest(scoresheets[:3]) == 0
+    assert dataset.ingest(make_scoresheets(count=2, start=5)) == 2
+    assert dataset.players() == {"Ape": 7}
+
+
+def test_ingest_skips_run_logs(make_scoresheets):
+    dataset = api.Dataset()
+    scoresheets = make_scoresheets(count=3)
+    scoresheets.append(("Ape-210101-000000-1_log.txt", b"Turn 1"))
+    scoresheets.append(("notes.txt", b"Not a scoresheet"))
+
+    assert dataset.ingest(scoresheets) == 3
+    assert dataset.players() == {"Ape": 3}
+
+
+def test_ingest_failing_batch_adds_nothing(make_scoresheets):
+    dataset = api.Dataset()
+    scoresheets = make_scoresheets(count=3)
+    broken = ("Ape-210201-120000-12345.txt", b"\xff\xfe")
+
+    with pytest.raises(UnicodeDecodeError):
+        dataset.ingest([*scoresheets, broken])
+
+    assert dataset.players() == {}
+    assert dataset.ingest(scoresheets) == 3
+
+
+def test_ingest_merges_aliases_into_cached_data(make_scoresheets):
+    dataset = api.Dataset()
+    dataset.ingest(make_scoresheets("Ape", count=2))
+
+    assert len(dataset.data("Ape").xaxis()) == 2
+
+    dataset.ingest(make_scoresheets("ape", count=3, start=2, seed=1))
+
+    assert dataset.players() == {"ape": 5}
+    assert len(dataset.data("ape").xaxis()) == 5
+    assert len(dataset.data("ape", "runs").xaxis()) == 5
+
+
+def test_ingest_protobuf_requires_generated_module(monkeypatch):
+    monkeypatch.setattr(api, "scoresheet_pb2", None)
+
+    with pytest.raises(RuntimeError, match="build_proto.sh"):
+        api.Dataset().ingest([("game.pb", b"")], protobuf=True)
@@ -0,0 +1,43 @@
+from cogmindgraph import pack
+
+
+def write_scoresheets(path, make_scoresheets, **kwargs):
+    path.mkdir(exist_ok=True)
+    paths = []
+
+    for name, content in make_scoresheets(**kwargs):
+        (path / name).write_bytes(content)
+        paths.append(path / name)
+
+    return paths
+
+
+def test_append_and_read(tmp_path, make_scoresheets, monkeypatch):
+    monkeypatch.setattr(pack, "BLOCK_SIZE", 2000)
+    paths = write_scoresheets(tmp_path / "scores", make_scoresheets)
+    pack_path = tmp_path / "scores.pack"
+
+    assert pack.append(pack_path, paths[:20]) == 20
+    assert pack.append(pack_path, paths) == 10
+    assert pack.append(pack_path, paths) == 0
+
+    blocks = {x[1] for x in pack.read_index(pack_path)}
+    assert len(blocks) > 2
+    assert dict(pack.read(pack_path)) == {x.name: x.read_bytes()
+                                          for x in paths}
+
+
+def test_partial_index_line(tmp_path, make_scoresheets):
+    paths = write_scoresheets(tmp_path / "scores", make_scoresheets)
+    pack_path = tmp_path / "scores.pack"
+    pack.append(pack_path, paths[:10])
+
+    with open(pack.index_path(pack_path), "a") as index:
+        index.write(f"{paths[10].name}\t12")
+
+    assert pack.names([pack_path]) == {x.name for x in paths[:10]}
+    assert len(list(pack.read(pack_path))) == 10
+
+    assert pack.append(pack_path, paths) == 20
+    assert dict(pack.read(pack_path)) == {x.name: x.read_bytes()
+                                          for x in paths}
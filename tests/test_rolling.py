@@ -0,0 +1,84 @@
+import argparse
+
+import numpy as np
+import pytest
+
+from cogmindgraph import __main__ as cli
+from cogmindgraph import rolling
+
+
+def brute_force(y, size):
+    stats = {"mean": [], "median": [], "low": [], "high": []}
+
+    for i in range(len(y)):
+        window = y[:i + 1]
+        window = window[np.isfinite(window)][-size:]
+        stats["mean"].append(np.mean(window))
+        stats["median"].append(np.median(window))
+        stats["low"].append(np.percentile(window, 25))
+        stats["high"].append(np.percentile(window, 75))
+
+    return stats
+
+
+@pytest.fixture
+def y():
+    y = np.random.default_rng(0).integers(0, 1000, 50).astype(float)
+    y[[3, 10, 11]] = np.nan
+    return y
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 100])
+def test_matches_brute_force(tmp_path, y, size):
+    stats = rolling.Store(tmp_path / "rolling.json", size).update("score", y)
+
+    for key, expected in brute_force(y, size).items():
+        assert stats[key] == pytest.approx(expected)
+
+
+def test_resumes_from_saved_state(tmp_path, y):
+    path = tmp_path / "rolling.json"
+    store = rolling.Store(path, 5)
+    store.update("score", y[:30])
+    store.save()
+
+    store = rolling.Store(path, 5)
+    assert store._windows["score"].count == 30
+
+    stats = store.update("score", y)
+    assert store._windows["score"].count == 50
+    assert stats["mean"] == pytest.approx(brute_force(y, 5)["mean"])
+
+
+def test_restarts_when_history_changes(tmp_path, y):
+    path = tmp_path / "rolling.json"
+    store = rolling.Store(path, 5)
+    store.update("score", y[:30])
+    store.save()
+
+    changed = y.copy()
+    changed[0] += 1
+    stats = rolling.Store(path, 5).update("score", changed)
+    assert stats["mean"] == pytest.approx(brute_force(changed, 5)["mean"])
+
+    stats = rolling.Store(path, 8).update("score", y)
+    assert stats["mean"] == pytest.approx(brute_force(y, 8)["mean"])
+
+
+@pytest.mark.parametrize("size", [0, -1])
+def test_invalid_window_size(tmp_path, size):
+    with pytest.raises(ValueError):
+        rolling.Window(size)
+
+    with pytest.raises(ValueError):
+        rolling.Store(tmp_path / "rolling.json", size)
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "1.5", "x"])
+def test_invalid_window_argument(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        cli.parse_window(value)
+
+
+def test_window_argument():
+    assert cli.parse_window("20") == 20
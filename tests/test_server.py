@@ -0,0 +1,110 @@
+import argparse
+import concurrent.futures
+import http.client
+import threading
+
+import pytest
+
+from cogmindgraph import scores, server
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = server.DiskCache(tmp_path, 10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")
+    cache.put("c", b"1234")
+
+    assert cache.get("a") == b"1234"
+    assert cache.get("b") is None
+    assert sorted(x.name for x in tmp_path.iterdir()) == ["a", "c"]
+
+
+def test_disk_cache_forgets_missing_files(tmp_path):
+    cache = server.DiskCache(tmp_path, 10)
+    cache.put("a", b"1234")
+    (tmp_path / "a").unlink()
+
+    assert cache.get("a") is None
+
+    cache.put("b", b"123456")
+    cache.put("c", b"1234")
+
+    assert cache.get("b") == b"123456"
+
+
+def test_disk_cache_restores_from_disk(tmp_path):
+    server.DiskCache(tmp_path, 10).put("a", b"1234")
+
+    assert server.DiskCache(tmp_path, 10).get("a") == b"1234"
+
+
+@pytest.fixture
+def graph_server(tmp_path):
+    renders = []
+
+    def render(x):
+        player, data, names, image_format, size, renderer = x
+        renders.append((player, names[0], size))
+
+        if player == "Bob":
+            raise RuntimeError("render failed")
+
+        return {names[0]: f"<svg>{player} {size}</svg>".encode()}
+
+    args = argparse.Namespace(
+        output=tmp_path, xaxis=["time"], size=1280, thumbnail_size=320,
+        renderer="native", format="svg", memory_cache=1, disk_cache=1)
+    datasets = {x: (scores.Data([], "time"), {"hash": x.lower()})
+                for x in ["Ape", "Bob"]}
+
+    with concurrent.futures.ThreadPoolExecutor() as pool:
+        httpd = server.GraphServer(("localhost", 0), datasets, render, pool,
+                                   args)
+        thread = threading.Thread(target=httpd.serve_forever)
+        thread.start()
+
+        def get(path):
+            connection = http.client.HTTPConnection(*httpd.server_address)
+            connection.request("GET", path)
+            response = connection.getresponse()
+            result = (response.status, response.getheader("Location"),
+                      response.read())
+            connection.close()
+            return result
+
+        httpd.get = get
+        httpd.renders = renders
+
+        yield httpd
+
+        httpd.shutdown()
+        httpd.server_close()
+        thread.join()
+
+
+def test_renders_once(graph_server):
+    assert graph_server.get("/Ape/score.svg")[2] == b"<svg>Ape 1280</svg>"
+    assert graph_server.get("/Ape/score.svg")[2] == b"<svg>Ape 1280</svg>"
+    assert graph_server.get("/Ape/thumbs/score.svg")[2] == (
+        b"<svg>Ape 320</svg>")
+    assert graph_server.renders == [("Ape", "score", 1280),
+                                    ("Ape", "score", 320)]
+
+
+def test_failed_render_responds_with_error(graph_server):
+    assert graph_server.get("/Bob/score.svg")[0] == 500
+    assert graph_server.get("/Bob/score.svg")[0] == 500
+    assert len(graph_server.renders) == 2
+
+
+def test_player_redirect_keeps_query(graph_server):
+    status, location, _ = graph_server.get("/Ape?q=1")
+
+    assert status == 301
+    assert location == "/Ape/?q=1"
+
+
+def test_unknown_paths(graph_server):
+    assert graph_server.get("/Eve/score.svg")[0] == 404
+    assert graph_server.get("/Ape/nothing.svg")[0] == 404
@@ -0,0 +1,67 @@
+import argparse
+
+import pytest
+
+from cogmindgraph import __main__ as cli
+from cogmindgraph import scores
+
+
+@pytest.fixture(scope="module")
+def players(make_scoresheets):
+    result = {}
+
+    for seed, player in enumerate(["Ape", "Bob", "Eve"]):
+        items = make_scoresheets(player, count=3, seed=seed)
+        result[player] = [game for _, game in scores.parse_games(
+            items, func=scores.parse_game_packed)]
+
+    return result
+
+
+def finish_shard(output_dir, shard, players):
+    args = argparse.Namespace(output=output_dir, shard=shard)
+    cli.write_shard_manifest(players, args)
+    entries = cli.merge_shard_manifests(output_dir, shard[1])
+
+    if entries is None:
+        return None
+
+    return sorted(x["player"] for x in entries)
+
+
+def test_last_shard_merges(tmp_path, players):
+    assert finish_shard(tmp_path, (2, 3), {"Bob": players["Bob"]}) is None
+    assert finish_shard(tmp_path, (1, 3), {"Ape": players["Ape"]}) is None
+    assert finish_shard(tmp_path, (3, 3), {"Eve": players["Eve"]}) == [
+        "Ape", "Bob", "Eve"]
+    assert cli.shard_generation(tmp_path, 3) == 1
+
+
+def test_stale_shards_are_not_merged(tmp_path, players):
+    finish_shard(tmp_path, (1, 2), {"Ape": players["Ape"]})
+    finish_shard(tmp_path, (2, 2), {"Bob": players["Bob"]})
+
+    assert finish_shard(tmp_path, (1, 2), {"Ape": players["Ape"],
+                                           "Eve": players["Eve"]}) is None
+    assert finish_shard(tmp_path, (2, 2), {"Bob": players["Bob"]}) == [
+        "Ape", "Bob", "Eve"]
+    assert cli.shard_generation(tmp_path, 2) == 2
+
+
+def test_rerun_shard(tmp_path, players):
+    finish_shard(tmp_path, (1, 2), {"Ape": players["Ape"]})
+    finish_shard(tmp_path, (2, 2), {"Bob": players["Bob"]})
+
+    assert finish_shard(tmp_path, (2, 2), {"Eve": players["Eve"]}) is None
+    assert finish_shard(tmp_path, (2, 2), {"Bob": players["Bob"],
+                                           "Eve": players["Eve"]}) is None
+    assert finish_shard(tmp_path, (1, 2), {"Ape": players["Ape"]}) == [
+        "Ape", "Bob", "Eve"]
+
+
+def test_shard_counts_are_separate(tmp_path, players):
+    finish_shard(tmp_path, (1, 2), {"Ape": players["Ape"]})
+
+    assert finish_shard(tmp_path, (1, 1), {"Bob": players["Bob"]}) == ["Bob"]
+    assert finish_shard(tmp_path, (2, 2), {"Eve": players["Eve"]}) == [
+        "Ape", "Eve"]
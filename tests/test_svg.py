@@ -0,0 +1,195 @@
+import collections
+import re
+import xml.etree.ElementTree
+
+import matplotlib
+
+matplotlib.use("svg")
+
+import matplotlib.collections
+import matplotlib.pyplot as plt
+import matplotlib.ticker
+import numpy as np
+import pytest
+
+from cogmindgraph import graphs, plotting, rolling, scores, svg
+
+
+NUMERIC_XAXES = [x for x in scores.XAXES if x != "date"]
+
+SVG_NAMESPACE = "{http://www.w3.org/2000/svg}"
+
+# The native writer rounds coordinates to two decimals.
+TOLERANCE = 0.01
+
+
+Rendering = collections.namedtuple(
+    "Rendering", "limits xlabels ylabels texts markers lines bands")
+
+
+@pytest.fixture(scope="module")
+def games(make_scoresheets):
+    return [game for _, game in scores.parse_games(
+        make_scoresheets(), func=scores.parse_game_packed)]
+
+
+def formatter():
+    return matplotlib.ticker.FuncFormatter(plotting.smart_format)
+
+
+def setup_axes(ax, func, data):
+    ax.set_xlabel(data.xlabel())
+    ax.xaxis.set_major_formatter(formatter())
+    ax.yaxis.set_major_formatter(formatter())
+
+    func(ax, data)
+
+    ax.set_xlim(0, ax.get_xticks()[-1])
+    ax.set_ylim(ymax=ax.get_yticks()[-1])
+
+
+def finite(points):
+    points = np.ma.filled(np.asarray(points, dtype=float), np.nan)
+    return points[np.isfinite(points).all(axis=1)]
+
+
+def render_matplotlib(func, data):
+    fig, ax = plt.subplots()
+    setup_axes(ax, func, data)
+    fig.canvas.draw()
+
+    scale = 72 / fig.dpi
+    height = fig.bbox.height
+
+    def to_svg(points):
+        points = finite(points)
+        return np.column_stack([points[:, 0] * scale,
+                                (height - points[:, 1]) * scale])
+
+    markers = []
+    bands = []
+
+    for collection in ax.collections:
+        if isinstance(collection, matplotlib.collections.PathCollection):
+            transform = collection.get_offset_transform()
+            markers.extend(to_svg(transform.transform(
+                finite(collection.get_offsets()))))
+        else:
+            for path in collection.get_paths():
+                bands.extend(to_svg(collection.get_transform().transform(
+                    path.vertices)))
+
+    lines = []
+
+    for line in ax.lines:
+        lines.extend(to_svg(line.get_transform().transform(
+            line.get_xydata())))
+
+    xlabels = [x.get_text() for x in ax.get_xticklabels() if x.get_text()]
+    ylabels = [x.get_text() for x in ax.get_yticklabels()
+               if x.get_visible() and x.get_text()]
+    texts = [ax.get_title(), ax.get_xlabel(), ax.get_ylabel(), *xlabels,
+             *ylabels, *(x.get_text() for x in ax.texts)]
+
+    if ax.get_legend():
+        texts.extend(x.get_text() for x in ax.get_legend().get_texts())
+
+    limits = (*ax.get_xlim(), *ax.get_ylim())
+    plt.close(fig)
+
+    return Rendering(limits, xlabels, ylabels, [x for x in texts if x],
+                     markers, lines, bands)
+
+
+def render_native(func, data):
+    fig = svg.Figure()
+    ax = fig.axes
+    setup_axes(ax, func, data)
+    root = xml.etree.ElementTree.fromstring(fig.to_svg())
+
+    markers = [(float(x.get("cx")), float(x.get("cy")))
+               for group in root.iter(f"{SVG_NAMESPACE}g")
+               for x in group.iter(f"{SVG_NAMESPACE}circle")]
+    lines = []
+    bands = []
+
+    for path in root.iter(f"{SVG_NAMESPACE}path"):
+        if path.get("clip-path") is None:
+            continue
+
+        d = path.get("d")
+        points = [tuple(map(float, x.split()))
+                  for x in re.findall(r"-?[\d.]+ -?[\d.]+", d)]
+        (bands if d.endswith("Z") else lines).extend(points)
+
+    texts = [x.text for x in root.iter(f"{SVG_NAMESPACE}text")]
+    limits = (*ax.xaxis.get_view_interval(), *ax.yaxis.get_view_interval())
+
+    return Rendering(limits, list(ax.xaxis.visible_ticks()[1]),
+                     list(ax.yaxis.visible_ticks()[1]), texts, markers,
+                     lines, bands)
+
+
+def assert_same_points(points, expected):
+    points = np.array(sorted(map(tuple, points)))
+    expected = np.array(sorted(map(tuple, expected)))
+
+    assert points.shape == expected.shape
+    assert points == pytest.approx(expected, abs=TOLERANCE)
+
+
+def assert_same_outline(points, expected):
+    points = np.array(points).reshape(-1, 2)
+    expected = np.array(expected).reshape(-1, 2)
+
+    assert bool(len(points)) == bool(len(expected))
+
+    if len(points):
+        distances = np.hypot(*(points[:, None] - expected[None]).T)
+        assert distances.min(axis=0).max() < TOLERANCE
+        assert distances.min(axis=1).max() < TOLERANCE
+
+
+@pytest.mark.parametrize("window", [None, 5])
+@pytest.mark.parametrize("xaxis", NUMERIC_XAXES)
+@pytest.mark.parametrize("graph", graphs.graphs)
+def test_native_matches_matplotlib(games, graph, xaxis, window, tmp_path):
+    store = None
+
+    if window:
+        store = rolling.Store(tmp_path / "rolling.json", window)
+
+    data = scores.Data(games, xaxis, store).with_graph(graph)
+    func = graphs.graphs[graph]
+
+    expected = render_matplotlib(func, data)
+    rendering = render_native(func, data)
+
+    assert rendering.limits == pytest.approx(expected.limits, rel=1e-6,
+                                             abs=1e-6)
+    assert rendering.xlabels == expected.xlabels
+    assert rendering.ylabels == expected.ylabels
+    assert sorted(rendering.texts) == sorted(expected.texts)
+    assert_same_points(rendering.markers, expected.markers)
+    assert_same_points(rendering.lines, expected.lines)
+    assert_same_outline(rendering.bands, expected.bands)
+
+
+def test_date_axis_is_not_supported(games, tmp_path):
+    data = scores.Data(games, "date")
+
+    with pytest.raises(NotImplementedError):
+        svg.plot(graphs.graphs["score"], data, "Ape", tmp_path / "score.svg",
+                 formatter())
+
+
+def test_unsupported_axes_method_falls_back(games, tmp_path):
+    def graph(ax, data):
+        ax.axhline(0)
+        ax.scatter(data.xaxis(), data["score"])
+
+    path = tmp_path / "graph.svg"
+    plotting.plot_native(graph, scores.Data(games, "time"), "Ape", path,
+                         formatter())
+
+    assert "Matplotlib" in path.read_text()